@@ -0,0 +1,74 @@
+# pylint: disable=invalid-name,no-member,too-few-public-methods
+""" Module managing images. Each image is loaded on first use and converted
+    to the pixel format of the display as soon as there is one, so that
+    blitting it doesn't need a conversion every time. In headless mode images
+    aren't decoded at all and blank surfaces of the right size are used. """
+
+import os
+import struct
+
+import pygame
+
+headless = False # set to skip loading images (e.g. in simulations)
+
+images = {} # the mapping between paths and loaded images
+converted = set() # paths of the images converted to the display format
+
+
+def load(path):
+    """ Returns the image stored at path (relative to the images directory). """
+    image = images.get(path)
+    if image is None:
+        if headless:
+            image = pygame.Surface(size(path)) # pylint: disable=too-many-function-args
+        else:
+            image = pygame.image.load(os.path.join("images", path))
+        images[path] = image
+    if path not in converted and pygame.display.get_surface() is not None:
+        image = images[path] = convert(image)
+        converted.add(path)
+    return image
+
+
+def size(path):
+    """ Reads the size of a PNG image from its header. """
+    with open(os.path.join("images", path), "rb") as file:
+        header = file.read(24)
+    return struct.unpack(">II", header[16:24])
+
+
+def convert(image):
+    """ Converts image to the display format, dropping per-pixel alpha
+        if the image is fully opaque anyway. """
+    w, h = image.get_size()
+    if image.get_flags() & pygame.SRCALPHA and pygame.mask.from_surface(image, 254).count() < w * h:
+        return image.convert_alpha()
+    return image.convert()
+
+
+class Image:
+    """ Image loaded on first use, meant to be a class attribute of a sprite. """
+
+    def __init__(self, *path):
+        self.path = os.path.join(*path)
+
+    def __get__(self, instance, owner):
+        return load(self.path)
+
+
+class Images:
+    """ Collection of images loaded on first use, indexed in the same way
+        as the dict or list of paths (tuples of their parts) it has been
+        created with. """
+
+    def __init__(self, paths):
+        if isinstance(paths, dict):
+            self.paths = {key: os.path.join(*path) for key, path in paths.items()}
+        else:
+            self.paths = [os.path.join(*path) for path in paths]
+
+    def __getitem__(self, key):
+        return load(self.paths[key])
+
+    def __len__(self):
+        return len(self.paths)
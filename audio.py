@@ -0,0 +1,188 @@
+# pylint: disable=missing-function-docstring
+""" Module defining the Sound class used for all sound effects, the Mixer
+    deciding which of them are actually played, and the Music class used
+    for the background music. """
+
+import os
+
+import pygame
+
+from timers import scheduler
+
+
+class Sound:
+    """ Sound effect loaded on first use. As long as the mixer hasn't been
+        initialized, playing it does nothing, so the game logic can run
+        without audio. Sounds are played through the Mixer (see mixer).
+
+        Parameters
+            volume: float - between 0 and 1
+            priority: int - sounds with a higher priority cut off the ones
+                with a lower priority when all channels are busy
+            voices: int - how many copies of the sound may play at once
+            reserved: bool - whether the sound is played on the channels
+                kept free for important cues """
+
+    def __init__(self, *path, volume=1.0, priority=0, voices=4, reserved=False):
+        self.path = os.path.join(*path)
+        self.volume = volume
+        self.priority = priority
+        self.voices = voices
+        self.reserved = reserved
+        self.sound = None # the underlying pygame.mixer.Sound
+
+    def load(self):
+        """ Returns the underlying sound or None if there is no mixer. """
+        if self.sound is None and pygame.mixer.get_init():
+            self.sound = pygame.mixer.Sound(self.path)
+            self.sound.set_volume(self.volume)
+        return self.sound
+
+    def play(self, loops=0):
+        mixer.play(self, loops)
+
+    def fadeout(self, time):
+        if self.sound is not None:
+            self.sound.fadeout(time)
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.sound is not None:
+            self.sound.set_volume(volume)
+
+    def get_volume(self):
+        return self.volume
+
+
+class Mixer:
+    """ Class deciding on which channel a sound is played, if at all. Many
+        balls may ask for the same sound in a single frame, so:
+            - a sound played less than WINDOW ms ago isn't played again,
+            - at most Sound.voices copies of a sound play at once,
+            - when all channels are busy, the new sound takes the channel
+              of the playing sound with the lowest priority, if it is lower
+              than its own, or isn't played,
+            - RESERVED channels are used only by the reserved sounds. """
+    CHANNELS = 16
+    RESERVED = 2
+    WINDOW = 15 # ms, about a frame
+
+    def __init__(self):
+        self.reserved = 0 # number of reserved channels, see setup
+        self.started = {} # Sound -> ticks when it has been played last
+        self.owners = {} # pygame.mixer.Sound -> Sound
+        self.dropped = 0 # number of sounds which haven't been played
+
+    def setup(self):
+        """ Allocates the channels, must be called after the mixer has
+            been initialized. """
+        pygame.mixer.set_num_channels(self.CHANNELS)
+        pygame.mixer.set_reserved(self.RESERVED)
+        self.reserved = self.RESERVED
+
+    def play(self, sound, loops=0):
+        """ Plays sound unless one of the limits is reached. Returns the
+            channel it is played on or None. """
+        pg_sound = sound.load()
+        if pg_sound is None or not pygame.mixer.get_init():
+            return None
+        self.owners[pg_sound] = sound
+
+        ticks = pygame.time.get_ticks()
+        last = self.started.get(sound)
+        if last is not None and ticks - last < self.WINDOW or \
+                pg_sound.get_num_channels() >= sound.voices:
+            self.dropped += 1
+            return None
+
+        channel = self.find_channel(sound)
+        if channel is None:
+            self.dropped += 1
+            return None
+        channel.play(pg_sound, loops=loops)
+        self.started[sound] = ticks
+        return channel
+
+    def find_channel(self, sound):
+        """ Returns a free channel or the one to cut off for sound. """
+        # pygame.mixer.find_channel doesn't skip the reserved channels
+        channels = [pygame.mixer.Channel(i) for i in range(pygame.mixer.get_num_channels())]
+        reserved, channels = channels[:self.reserved], channels[self.reserved:]
+        for channel in (reserved + channels if sound.reserved else channels):
+            if not channel.get_busy():
+                return channel
+
+        # the unreserved channel playing the least important sound
+        if not channels:
+            return None
+        channel = min(channels, key=self.priority)
+        return channel if self.priority(channel) < sound.priority else None
+
+    def priority(self, channel):
+        owner = self.owners.get(channel.get_sound())
+        return -1 if owner is None else owner.priority
+
+
+class Music:
+    """ Background music looped on the music channel. The file is streamed
+        (pygame.mixer.music) instead of being decoded into memory as a whole,
+        so it may be large and compressed (e.g. OGG). Like Sound, it does
+        nothing as long as the mixer hasn't been initialized.
+
+        Parameters
+            volume: float - between 0 and 1
+            fade: int - duration (in ms) of the fade-in """
+    # whether pygame fades the music in by itself (pygame 2), otherwise the
+    # volume is raised by a timer (see timers.scheduler)
+    fade_ms = pygame.version.vernum >= (2,)
+    RAMP = 50 # ms between volume changes of a fade-in done by a timer
+
+    def __init__(self, *path, volume=1.0, fade=6000):
+        self.path = os.path.join(*path)
+        self.volume = volume
+        self.fade = fade
+        self.silent_at = None # ticks when the current fade-out ends
+        self.ramp = None # (Tween, Timer) of the fade-in done by a timer
+
+    def is_playing(self):
+        """ Returns whether the music is playing and not fading out. """
+        if not pygame.mixer.get_init() or not pygame.mixer.music.get_busy():
+            return False
+        return self.silent_at is None or pygame.time.get_ticks() >= self.silent_at
+
+    def play(self, restart=False):
+        """ Starts the music with a fade-in, unless it is already playing
+            and restart is False. """
+        if not pygame.mixer.get_init() or self.is_playing() and not restart:
+            return
+        self.stop_ramp()
+        pygame.mixer.music.load(self.path)
+        if self.fade_ms:
+            pygame.mixer.music.set_volume(self.volume)
+            pygame.mixer.music.play(-1, fade_ms=self.fade)
+        else:
+            pygame.mixer.music.set_volume(0)
+            pygame.mixer.music.play(-1)
+            self.ramp = (scheduler.tween(0, self.volume, self.fade),
+                         scheduler.every(self.RAMP, self.raise_volume, delay=0))
+        self.silent_at = None
+
+    def raise_volume(self):
+        tween, _ = self.ramp
+        pygame.mixer.music.set_volume(tween.value)
+        if tween.done:
+            self.stop_ramp()
+
+    def stop_ramp(self):
+        if self.ramp is not None:
+            self.ramp[1].cancel()
+            self.ramp = None
+
+    def fadeout(self, time):
+        if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
+            self.stop_ramp()
+            pygame.mixer.music.fadeout(time)
+            self.silent_at = pygame.time.get_ticks() + time
+
+
+mixer = Mixer()
@@ -2,30 +2,25 @@
 """ Module contatining the Ball class. """
 
 import math
-import os
 
 import pygame
 
 import events
+from assets import Image, Images
+from audio import Sound
+from pools import Pool, Pooled
 from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
 
 
-pygame.mixer.init(buffer=128)
-
-
-class Ball(pygame.sprite.Sprite):
+class Ball(Pooled, pygame.sprite.Sprite): # pylint: disable=too-many-instance-attributes
     """ Class representing a ball. """
-    images = {"base": pygame.image.load(os.path.join("images", "ball.png")),
-              "fiery": pygame.image.load(os.path.join("images", "fiery_ball.png"))}
-    image = images["base"] # the current image shared between all balls
-    sounds = {"paddle_hit": pygame.mixer.Sound(os.path.join("sounds", "paddle.ogg")),
-              "wall_hit": pygame.mixer.Sound(os.path.join("sounds", "wall_hit.wav"))}
-
-    # sound adjustments
-    sounds["paddle_hit"].set_volume(0.05)
-    sounds["wall_hit"].set_volume(0.25)
+    images = Images({"base": ("ball.png",), "fiery": ("fiery_ball.png",)})
+    image = Image("ball.png") # the current image shared between all balls
+    sounds = {"paddle_hit": Sound("sounds", "paddle.ogg", volume=0.05, voices=2),
+              "wall_hit": Sound("sounds", "wall_hit.wav", volume=0.25, voices=3)}
 
     MAXSPEED = 20
+    pool = Pool(size=256)
 
     # collected bonuses
     is_tiny = False
@@ -39,7 +34,9 @@ class Ball(pygame.sprite.Sprite):
 
     def __init__(self):
         pygame.sprite.Sprite.__init__(self)
+        self.reset()
 
+    def reset(self): # pylint: disable=arguments-differ
         self.rect = self.image.get_rect(
             center=(SCREEN_WIDTH // 2 + 10, SCREEN_HEIGHT - MARGIN - 20)
         )
@@ -50,11 +47,25 @@ class Ball(pygame.sprite.Sprite):
 
         self.is_attached = True # attached to the paddle?
 
-    def update(self):
+        self.fx, self.fy = 0.0, 0.0 # sub-pixel part of the position
+        self.moved = None # the last movement, (vx, vy) until the first one
+        self.previous = None # position before the last update (see Level.sprite_blits)
+
+    def update(self, substeps=1):
         """ Moves the ball and changes its direction if a boundary has
-            been hit or kills it if it has disappeared from the screen. """
+            been hit or kills it if it has disappeared from the screen.
+
+            Parameters
+                substeps: int - the ball covers 1 / substeps of its speed;
+                    the fractions of pixels are carried over """
         if not self.is_attached:
-            self.rect.move_ip(self.vx, self.vy)
+            self.fx += self.vx / substeps
+            self.fy += self.vy / substeps
+            dx, dy = round(self.fx), round(self.fy)
+            self.fx -= dx
+            self.fy -= dy
+            self.rect.move_ip(dx, dy)
+            self.moved = (dx, dy)
 
             if self.rect.left <= MARGIN:
                 self.sounds["wall_hit"].play()
@@ -84,7 +95,7 @@ class Ball(pygame.sprite.Sprite):
             self.sounds["paddle_hit"].play()
 
             if not self.is_attached:
-                self.rect.move_ip(-self.vx, -self.vy)
+                self.undo_move()
             self.is_attached = False
 
             paddle_x = paddle.rect.center[0]
@@ -105,12 +116,17 @@ class Ball(pygame.sprite.Sprite):
             self.vx = round(v_mag * math.cos(alpha))
             self.vy = -round(v_mag * math.sin(alpha))
 
+    def undo_move(self):
+        """ Moves the ball back to where it was before the last update. """
+        dx, dy = self.moved or (self.vx, self.vy)
+        self.rect.move_ip(-dx, -dy)
+
     def hit(self, tile):
         """ Triggered when the ball hits a tile. """
         from tiles import GlassTile # pylint: disable=import-outside-toplevel
 
         # change the direction of the ball
-        self.rect.move_ip(-self.vx, -self.vy)
+        self.undo_move()
         if not (isinstance(tile, GlassTile) and tile.hit):
             x1, y1 = tile.rect.center
             x2, y2 = self.rect.center
@@ -122,6 +138,6 @@ class Ball(pygame.sprite.Sprite):
 
         if self.is_fiery:
             tile.kill()
-            pygame.event.post(pygame.event.Event(events.EXPLOSION, where=tile.rect.topleft))
+            events.post(events.Explosion(tile.rect.topleft))
         else:
             tile.on_hit()
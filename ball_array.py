@@ -0,0 +1,229 @@
+# pylint: disable=missing-function-docstring,invalid-name,no-member,attribute-defined-outside-init,access-member-before-definition
+""" Module containing the BallArray class, a NumPy alternative to a group of
+    Ball sprites used when there are very many balls in play. """
+
+import math
+
+import numpy
+import pygame
+
+import events
+from ball import Ball
+from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
+from tiles import GlassTile, WIDTH, HEIGHT
+
+
+class BallArray:
+    """ Class representing all balls in play as a struct of arrays: positions
+        of the top left corners, speed components and attached flags, along
+        with the sub-pixel parts of the positions (fx, fy), the last
+        movements (mx, my) and the positions before the last update (px, py).
+        Balls are moved, bounced and killed in batches, following the same
+        rules as Ball.update, Ball.on_hit and Ball.hit. The class-wide ball
+        state (image, is_fiery) is still taken from the Ball class. """
+    # the arrays, set with setattr (which pylint can't follow, see the top)
+    FIELDS = {"x": int, "y": int, "vx": int, "vy": int, "attached": bool,
+              "fx": float, "fy": float, "mx": int, "my": int, "px": int, "py": int}
+
+    def __init__(self, *balls):
+        self.w, self.h = Ball.images["base"].get_size()
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, numpy.empty(0, dtype=dtype))
+        self.add(*balls)
+
+    def __len__(self):
+        return len(self.x)
+
+    def add(self, *balls):
+        """ Adds copies of the given Ball sprites. """
+        if balls:
+            self.append(
+                [ball.rect.left for ball in balls], [ball.rect.top for ball in balls],
+                [ball.vx for ball in balls], [ball.vy for ball in balls],
+                [ball.is_attached for ball in balls]
+            )
+
+    def append(self, x, y, vx, vy, attached):
+        """ Adds balls which haven't moved yet (see Ball.__init__). """
+        zeros = numpy.zeros(len(x))
+        values = {"x": x, "y": y, "vx": vx, "vy": vy, "attached": attached,
+                  "fx": zeros, "fy": zeros, "mx": vx, "my": vy, "px": x, "py": y}
+        for name, dtype in self.FIELDS.items():
+            array = numpy.asarray(values[name], dtype=dtype)
+            setattr(self, name, numpy.concatenate((getattr(self, name), array)))
+
+    def keep(self, mask):
+        """ Removes all balls not selected by mask. """
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name)[mask])
+
+    def empty(self):
+        self.keep(numpy.zeros(len(self), dtype=bool))
+
+    def sprites(self):
+        """ Returns snapshots of the balls as new Ball sprites, which
+            aren't taken from the pool as they never go back to it. """
+        balls = []
+        for x, y, vx, vy, attached in zip(self.x, self.y, self.vx, self.vy, self.attached):
+            ball = Ball()
+            ball.rect.topleft = int(x), int(y)
+            ball.vx, ball.vy, ball.is_attached = int(vx), int(vy), bool(attached)
+            balls.append(ball)
+        return balls
+
+    def remember_positions(self):
+        self.px, self.py = self.x.copy(), self.y.copy()
+
+    def max_speed(self):
+        """ Returns the largest speed component of the moving balls. """
+        moving = ~self.attached
+        if not moving.any():
+            return 0
+        return int(max(numpy.abs(self.vx[moving]).max(), numpy.abs(self.vy[moving]).max()))
+
+    def update(self, substeps=1):
+        """ Moves the balls, bounces them off the walls and kills the ones
+            which have disappeared from the screen (see Ball.update). """
+        moving = ~self.attached
+        self.fx[moving] += self.vx[moving] / substeps
+        self.fy[moving] += self.vy[moving] / substeps
+        dx = numpy.rint(self.fx[moving]).astype(int)
+        dy = numpy.rint(self.fy[moving]).astype(int)
+        self.fx[moving] -= dx
+        self.fy[moving] -= dy
+        self.x[moving] += dx
+        self.y[moving] += dy
+        self.mx[moving], self.my[moving] = dx, dy
+
+        # the same precedence as in Ball.update: left, right, top, bottom
+        left = moving & (self.x <= MARGIN)
+        right = moving & ~left & (self.x + self.w >= SCREEN_WIDTH - MARGIN)
+        top = moving & ~left & ~right & (self.y <= 2 * MARGIN)
+        gone = moving & ~left & ~right & ~top & (self.y > SCREEN_HEIGHT + MARGIN)
+
+        self.x[left] = MARGIN
+        self.x[right] = SCREEN_WIDTH - MARGIN - self.w
+        self.vx[left | right] *= -1
+        self.y[top] = 2 * MARGIN
+        self.vy[top] *= -1
+        if (left | right | top).any():
+            Ball.sounds["wall_hit"].play()
+
+        if gone.any():
+            self.keep(~gone)
+
+    def drag(self, dx):
+        """ Moves the balls attached to the paddle along with it. """
+        self.x[self.attached] += dx
+
+    def bounce(self, mask, paddle):
+        """ Sends the selected balls off the paddle (see Ball.on_hit). """
+        if not mask.any():
+            return
+        Ball.sounds["paddle_hit"].play()
+
+        moving = mask & ~self.attached
+        self.x[moving] -= self.mx[moving]
+        self.y[moving] -= self.my[moving]
+        self.attached[mask] = False
+
+        # change the direction of the balls
+        min_alpha = math.pi / 12
+        ball_x = self.x[mask] + self.w // 2
+        alpha = -math.pi * (ball_x - paddle.rect.center[0]) / len(paddle) + math.pi / 2
+        d = alpha - math.pi / 2
+        alpha = numpy.where(numpy.abs(d) < min_alpha,
+                            math.pi / 2 + numpy.copysign(min_alpha, d), alpha)
+        alpha = numpy.where(numpy.abs(d) > math.pi / 2 - min_alpha,
+                            math.pi / 2 + numpy.copysign(math.pi / 2 - min_alpha, d), alpha)
+        self.y[mask] = paddle.rect.top - 1 - self.h
+
+        v_mag = numpy.hypot(self.vx[mask], self.vy[mask])
+        v_mag = numpy.minimum(Ball.MAXSPEED, v_mag + 0.33)
+
+        self.vx[mask] = numpy.rint(v_mag * numpy.cos(alpha))
+        self.vy[mask] = -numpy.rint(v_mag * numpy.sin(alpha))
+
+    def release(self, paddle):
+        """ Releases all balls attached to the paddle. """
+        self.bounce(self.attached.copy(), paddle)
+
+    def collide_paddle(self, paddle):
+        """ Handles the balls hitting the paddle. """
+        r = paddle.rect
+        hit = ((self.x < r.right) & (self.x + self.w > r.left)
+               & (self.y < r.bottom) & (self.y + self.h > r.top))
+        if paddle.is_magnetic:
+            caught = hit & ~self.attached
+            self.y[caught] = r.top - 1 - self.h
+            self.attached[caught] = True
+            hit &= ~caught
+        self.bounce(hit, paddle)
+
+    def collide_tiles(self, tiles):
+        """ Handles the balls hitting tiles. The cells under the corners of
+            each ball are looked up in an occupancy grid in one go, only the
+            few balls touching a tile are then resolved one by one. """
+        columns, rows = tiles.columns, tiles.rows
+        occupied = numpy.zeros((columns + 2, rows + 2), dtype=bool)
+        for i, j in tiles.occupied():
+            occupied[i + 1, j + 1] = True
+
+        # shifted by one, so that the cells just outside the grid stay empty
+        i1 = numpy.clip((self.x - MARGIN) // WIDTH + 1, 0, columns + 1)
+        j1 = numpy.clip((self.y - 3 * MARGIN) // HEIGHT + 1, 0, rows + 1)
+        i2 = numpy.clip((self.x + self.w - 1 - MARGIN) // WIDTH + 1, 0, columns + 1)
+        j2 = numpy.clip((self.y + self.h - 1 - 3 * MARGIN) // HEIGHT + 1, 0, rows + 1)
+        touching = (occupied[i1, j1] | occupied[i2, j1] | occupied[i1, j2] | occupied[i2, j2])
+
+        for k in numpy.flatnonzero(touching):
+            rect = pygame.Rect(int(self.x[k]), int(self.y[k]), self.w, self.h)
+            hit = tiles.collide(rect)
+            if hit:
+                self.hit(k, hit[0])
+
+    def hit(self, k, tile):
+        """ Triggered when the k-th ball hits a tile (see Ball.hit). """
+        # change the direction of the ball
+        self.x[k] -= self.mx[k]
+        self.y[k] -= self.my[k]
+        if not (isinstance(tile, GlassTile) and tile.hit):
+            x1, y1 = tile.rect.center
+            x2, y2 = int(self.x[k]) + self.w // 2, int(self.y[k]) + self.h // 2
+            dx, dy = x2 - x1, y2 - y1
+            if  -dx <= 1.8 * dy <= dx or dx <= 1.8 * dy <= -dx:
+                self.vx[k] *= -1
+            else:
+                self.vy[k] *= -1
+
+        if Ball.is_fiery:
+            tile.kill()
+            events.post(events.Explosion(tile.rect.topleft))
+        else:
+            tile.on_hit()
+
+    def split(self):
+        """ Doubles the number of balls (see the Split bonus). """
+        self.append(self.x, self.y, -self.vx, self.vy, self.attached)
+
+    def speed_up(self):
+        """ Sets the speed of all balls to the max (see the SpeedUp bonus). """
+        v_mag = numpy.hypot(self.vx, self.vy)
+        self.vx = numpy.trunc(Ball.MAXSPEED * self.vx / v_mag).astype(int)
+        self.vy = numpy.trunc(Ball.MAXSPEED * self.vy / v_mag).astype(int)
+
+    def blits(self, alpha=1.0, shift=0):
+        """ Returns the (image, position) pairs of the balls, put the fraction
+            alpha of the way from their previous positions, and the attached
+            ones shifted along with the paddle (see Level.sprite_blits). """
+        x, y = self.x, self.y
+        if alpha != 1:
+            x0 = numpy.rint(self.px + alpha * (x - self.px)).astype(int)
+            y0 = numpy.rint(self.py + alpha * (y - self.py)).astype(int)
+            x, y = numpy.where(self.attached, x, x0), numpy.where(self.attached, y, y0)
+        if shift:
+            x = x + numpy.where(self.attached, shift, 0)
+        return [(Ball.image, (int(x), int(y))) for x, y in zip(x, y)]
+
+    def draw(self, surface):
+        surface.blits(self.blits(), False)
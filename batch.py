@@ -0,0 +1,159 @@
+# pylint: disable=invalid-name
+""" Script playing many games of a level with a simple paddle bot, without
+    a display, and reporting statistics about them. Games are spread over
+    all CPU cores with a process pool; each one is seeded, so the whole
+    batch is reproducible.
+
+        python batch.py 1 --games 1000 """
+
+import argparse
+import collections
+import concurrent.futures
+import functools
+import json
+import os
+import random
+import statistics
+import sys
+
+import assets
+import events
+import levelpack
+from level import Level
+from main import FPS
+from simulation import Simulation
+
+Result = collections.namedtuple("Result", ["cleared", "frames", "score", "deaths", "bonuses"])
+
+
+class Bot: # pylint: disable=too-few-public-methods
+    """ Class representing a paddle bot. It releases the balls right away
+        and follows the ball which is the closest to the paddle, hitting
+        it with a random part of the paddle to vary the angles. """
+    SPEED = 20 # max paddle movement per frame
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.offset = 0 # where to hit the ball, relative to the paddle center
+
+    def move(self, lvl):
+        """ Returns the paddle movement and the number of clicks. """
+        paddle = lvl.paddle
+        balls = lvl.balls.sprites()
+        if not balls:
+            return 0, 0
+        if paddle.attached_balls or any(ball.is_attached for ball in balls):
+            self.offset = self.random.randint(-len(paddle) // 3, len(paddle) // 3)
+            return 0, 1
+
+        # the lowest ball falling down, or the lowest one if none is
+        falling = [ball for ball in balls if ball.vy > 0] or balls
+        ball = max(falling, key=lambda ball: ball.rect.bottom)
+        if ball.vy < 0 and ball.rect.bottom < paddle.rect.top - 100:
+            self.offset = self.random.randint(-len(paddle) // 3, len(paddle) // 3)
+        dx = ball.rect.centerx - paddle.rect.centerx - self.offset
+        dx = max(-self.SPEED, min(self.SPEED, dx))
+        return (-dx if paddle.is_confused else dx), 0
+
+
+def init(pack=None, tile_engine=None):
+    """ Prepares a worker process for running games. """
+    assets.headless = True
+    Simulation.prefetch = False # games end with the level
+    if pack is not None:
+        Level.pack = pack
+    if tile_engine is not None:
+        Level.tile_engine = tile_engine
+
+
+def play(n, seed, max_frames):
+    """ Plays level n until it is cleared, all lives are lost or max_frames
+        have passed and returns the Result. """
+    random.seed(seed)
+    sim = Simulation(n)
+    bot = Bot(seed)
+
+    bonuses = collections.Counter()
+    sim.bus.subscribe(events.BonusCollected, lambda event: bonuses.update([event.bonus.__name__]))
+
+    frames = 0
+    while frames < max_frames and not (sim.over or sim.lvl.finished):
+        dx, clicks = bot.move(sim.lvl)
+        sim.step(dx, clicks)
+        frames += 1
+    return Result(sim.lvl.finished and not sim.over, frames, sim.score, sim.deaths, bonuses)
+
+
+def run(n, games, seed=0, max_frames=10 * 60 * FPS, workers=None, **options):
+    """ Plays the games in a process pool and returns their Results. The
+        options (pack, tile_engine) are passed to init in every process. """
+    workers = workers or os.cpu_count()
+    seeds = [seed + k for k in range(games)]
+    initializer = functools.partial(init, **options)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=initializer) as pool:
+        chunksize = max(1, games // (4 * workers))
+        return list(pool.map(play, [n] * games, seeds, [max_frames] * games, chunksize=chunksize))
+
+
+def summarize(results):
+    """ Returns the statistics of a batch as a dict. """
+    scores = sorted(result.score for result in results)
+    bonuses = collections.Counter()
+    for result in results:
+        bonuses.update(result.bonuses)
+
+    deciles = statistics.quantiles(scores, n=10) if len(scores) > 1 else scores * 9
+    return {
+        "games": len(results),
+        "clear_rate": sum(result.cleared for result in results) / len(results),
+        "frames": statistics.mean(result.frames for result in results),
+        "score": {"min": scores[0], "mean": statistics.mean(scores),
+                  "deciles": deciles, "max": scores[-1]},
+        "deaths": statistics.mean(result.deaths for result in results),
+        "bonuses": {name: count / len(results) for name, count in sorted(bonuses.items())},
+    }
+
+
+def report(stats, file=sys.stdout):
+    """ Prints the statistics of a batch (see summarize) as text. """
+    score = stats["score"]
+    print(f"games:          {stats['games']}", file=file)
+    print(f"clear rate:     {stats['clear_rate']:.1%}", file=file)
+    print(f"frames:         {stats['frames']:.0f} on average", file=file)
+    print(f"score:          min {score['min']}, mean {score['mean']:.0f}, max {score['max']}",
+          file=file)
+    print(f"score deciles:  {', '.join(f'{d:.0f}' for d in score['deciles'])}", file=file)
+    print(f"deaths:         {stats['deaths']:.2f} per game", file=file)
+    print("bonus pickups per game:", file=file)
+    for name, count in stats["bonuses"].items():
+        print(f"    {name:<12}{count:.2f}", file=file)
+
+
+def main():
+    """ Runs a batch as given on the command line and reports it. """
+    parser = argparse.ArgumentParser(description="Plays many games of a level with a bot.")
+    parser.add_argument("level", type=int, help="the level number")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-frames", type=int, default=10 * 60 * FPS, help="per game")
+    parser.add_argument("--pack", help="the level pack (the default one if not given)")
+    parser.add_argument("--workers", type=int, help="number of processes (all cores if not given)")
+    parser.add_argument("--tile-engine", choices=["sprite", "grid"], help="see Level.tile_engine")
+    parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    args = parser.parse_args()
+
+    if args.level not in levelpack.get(args.pack or Level.pack):
+        parser.error(f"there is no level {args.level}")
+
+    results = run(args.level, args.games, args.seed, args.max_frames, args.workers,
+                  pack=args.pack, tile_engine=args.tile_engine)
+    stats = summarize(results)
+    if args.json:
+        json.dump(stats, sys.stdout, indent=4)
+        print()
+    else:
+        report(stats)
+
+
+if __name__ == "__main__":
+    main()
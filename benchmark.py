@@ -0,0 +1,282 @@
+# pylint: disable=invalid-name,no-member
+""" Script measuring the frame hot path: Level.update, detect_collisions,
+    explosion, draw and RunningGame.draw, in a set of fixed scenarios (an
+    empty level, a full grid, many balls, a chain of explosions, many
+    falling bonuses). Results, including the number of sprites allocated
+    per call once the pools are warm (see pools), are written as JSON and
+    compared with a stored baseline:
+
+        python benchmark.py                    # run all, compare with the baseline
+        python benchmark.py -k explosion       # only the matching benchmarks
+        python benchmark.py --save-baseline    # make the results the new baseline
+
+    The exit status is 1 if any benchmark got slower than the baseline by
+    more than the threshold. Every scenario is seeded, so runs only differ
+    in timing. """
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import pygame
+
+import events
+from ball import Ball
+from bonuses import Bonus
+from explosion import Explosion
+from game import Game
+from level import Level
+from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
+from tiles import RegularTile, ExplosiveTile, WIDTH, HEIGHT
+
+BASELINE = os.path.join("misc", "baseline.json")
+
+# setup() builds a fresh state, run(state) is timed; run is called number
+# times per setup and the whole is repeated repeat times
+Benchmark = collections.namedtuple("Benchmark", ["name", "setup", "run", "number", "repeat"])
+
+POOLS = [Ball.pool, Bonus.pool, Explosion.pool]
+
+
+def level(tile=None, balls=0, bonuses=0, engine="sprite"):
+    """ Returns a test level (see Level(0)) with the given contents.
+
+        Parameters
+            tile: Tile subclass - fills the whole grid (if None, there is
+                a single tile in the corner, so that the level isn't cleared)
+            balls: int - number of balls flying below the grid (the single
+                ball attached to the paddle is left if 0)
+            bonuses: int - number of falling bonuses
+            engine: str - Level.ball_engine """
+    rng = random.Random(0)
+    random.seed(0)
+    events.bus = events.Bus()
+
+    ball_engine, Level.ball_engine = Level.ball_engine, engine
+    try:
+        lvl = Level(0)
+        lvl.ball_engine = engine
+    finally:
+        Level.ball_engine = ball_engine
+
+    for i, column in enumerate(lvl.tile_matrix):
+        for j, _ in enumerate(column):
+            if tile is not None or i == j == 0:
+                column[j] = (tile or RegularTile)(MARGIN + WIDTH * i, 3 * MARGIN + HEIGHT * j)
+                lvl.tiles.add(column[j])
+
+    if balls:
+        lvl.balls.empty()
+        lvl.paddle.attached_balls.clear()
+        sprites = []
+        for _ in range(balls):
+            ball = Ball.get()
+            ball.is_attached = False
+            x = rng.randrange(2 * MARGIN, SCREEN_WIDTH - 2 * MARGIN)
+            y = rng.randrange(3 * MARGIN + 16 * HEIGHT, SCREEN_HEIGHT - 3 * MARGIN)
+            ball.rect.topleft = (x, y)
+            ball.vx, ball.vy = rng.choice((-1, 1)) * rng.randrange(2, 8), -rng.randrange(2, 8)
+            sprites.append(ball)
+        lvl.balls.add(*sprites)
+
+    for _ in range(bonuses):
+        x, y = rng.randrange(2 * MARGIN, SCREEN_WIDTH - 2 * MARGIN), rng.randrange(3 * MARGIN, 300)
+        lvl.bonuses.add(rng.choice(Bonus.types).get(x, y))
+    return lvl
+
+
+def drawn(lvl):
+    """ Returns (lvl, surface, background) with lvl drawn once, so that its
+        layer is already baked. """
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    lvl.draw(surface, background)
+    lvl.draw_dirty(surface, background)
+    return lvl, surface, background
+
+
+def running_game(tile=None, dirty_rects=True):
+    """ Returns (game, surface) with the game drawn once. """
+    game = Game.RunningGame(start_lvl=0)
+    game.lvl = level(tile)
+    game.activate()
+    game.dirty_rects = dirty_rects
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    game.draw(surface)
+    return game, surface
+
+
+def update(lvl):
+    """ Advances the level by one step without moving the paddle. """
+    lvl.update(dx=0)
+
+
+BENCHMARKS = [
+    Benchmark("update/empty", level, update, 100, 5),
+    Benchmark("update/full", lambda: level(RegularTile), update, 100, 5),
+    Benchmark("update/full/balls-1", lambda: level(RegularTile, balls=1), update, 100, 5),
+    Benchmark("update/full/balls-100", lambda: level(RegularTile, balls=100), update, 100, 5),
+    Benchmark("update/full/balls-1000", lambda: level(RegularTile, balls=1000), update, 50, 3),
+    Benchmark("update/full/balls-1000/array",
+              lambda: level(RegularTile, balls=1000, engine="array"), update, 50, 3),
+    Benchmark("update/bonuses-200", lambda: level(bonuses=200), update, 50, 5),
+    Benchmark("collisions/full/balls-100", lambda: level(RegularTile, balls=100),
+              Level.detect_collisions, 100, 5),
+    Benchmark("collisions/full/balls-1000", lambda: level(RegularTile, balls=1000),
+              Level.detect_collisions, 50, 3),
+    Benchmark("explosion/full", lambda: level(RegularTile),
+              lambda lvl: lvl.explosion(MARGIN + 8 * WIDTH, 3 * MARGIN + 8 * HEIGHT), 1, 50),
+    Benchmark("explosion/chain", lambda: level(ExplosiveTile),
+              lambda lvl: lvl.explosion(MARGIN, 3 * MARGIN), 1, 20),
+    Benchmark("draw/full", lambda: drawn(level(RegularTile)),
+              lambda state: state[0].draw(*state[1:]), 50, 5),
+    Benchmark("draw/full/balls-1000", lambda: drawn(level(RegularTile, balls=1000)),
+              lambda state: state[0].draw(*state[1:]), 20, 3),
+    Benchmark("draw-dirty/full/balls-100", lambda: drawn(level(RegularTile, balls=100)),
+              lambda state: (state[0].update(dx=0), state[0].draw_dirty(*state[1:])), 50, 5),
+    Benchmark("game-draw/full", lambda: running_game(RegularTile),
+              lambda state: state[0].draw(state[1]), 50, 5),
+    Benchmark("game-draw/full/no-dirty-rects", lambda: running_game(RegularTile, dirty_rects=False),
+              lambda state: state[0].draw(state[1]), 50, 5),
+]
+
+
+def measure(benchmark):
+    """ Runs a benchmark and returns the durations of the calls in ns,
+        as one list per repeat. """
+    repeats = []
+    for _ in range(benchmark.repeat):
+        state = benchmark.setup()
+        durations = []
+        for _ in range(benchmark.number):
+            start = time.perf_counter_ns()
+            benchmark.run(state)
+            durations.append(time.perf_counter_ns() - start)
+        repeats.append(durations)
+    return repeats
+
+
+def release(state):
+    """ Kills the sprites left in the level of a benchmark state, as the
+        following frames of a game would, so that they go back to the pools. """
+    if isinstance(state, tuple):
+        state = state[0]
+    lvl = getattr(state, "lvl", state) # a RunningGame or a Level
+    for event in events.get(): # nothing handles the events of a benchmark
+        if isinstance(event, events.BonusDropped):
+            lvl.bonuses.add(event.bonus)
+    groups = [lvl.bonuses, lvl.explosions]
+    if lvl.ball_engine != "array":
+        groups.append(lvl.balls)
+    for group in groups:
+        for sprite in group.sprites():
+            sprite.kill()
+
+
+def allocations(benchmark):
+    """ Runs a benchmark twice more and returns the average number of
+        sprites which couldn't be taken from the pools per call in the
+        second run. The first one warms the pools up. """
+    for _ in range(2):
+        state = benchmark.setup()
+        allocated = sum(pool.allocated for pool in POOLS)
+        for _ in range(benchmark.number):
+            benchmark.run(state)
+        allocated = sum(pool.allocated for pool in POOLS) - allocated
+        release(state)
+    return allocated / benchmark.number
+
+
+def summarize(repeats):
+    """ Returns the statistics of the durations in microseconds. The median
+        is the lowest of the medians of all repeats, which is less sensitive
+        to other processes than the median of all calls. """
+    durations = sorted(duration for durations in repeats for duration in durations)
+    return {
+        "calls": len(durations),
+        "min": durations[0] / 1000,
+        "median": min(statistics.median(durations) for durations in repeats) / 1000,
+        "mean": statistics.mean(durations) / 1000,
+        "p95": durations[min(len(durations) - 1, 95 * len(durations) // 100)] / 1000,
+    }
+
+
+def compare(results, baseline, threshold):
+    """ Returns the mapping between names of benchmarks and the ratios of
+        their median durations to the baseline ones, and the list of names
+        of the ones slower by more than threshold. """
+    ratios = {name: result["median"] / baseline[name]["median"]
+              for name, result in results.items() if name in baseline}
+    return ratios, [name for name, ratio in ratios.items() if ratio > 1 + threshold]
+
+
+def report(results, ratios, file=sys.stdout):
+    """ Prints the results as a table, with the changes from the baseline. """
+    print(f"{'benchmark':<34}{'median':>10}{'p95':>10}{'min':>10}{'allocs':>8}{'vs baseline':>14}",
+          file=file)
+    for name, result in results.items():
+        change = f"{ratios[name] - 1:+.1%}" if name in ratios else "-"
+        allocated = f"{result['allocated']:.1f}" if "allocated" in result else "-"
+        print(f"{name:<34}{result['median']:>8.0f}us{result['p95']:>8.0f}us"
+              f"{result['min']:>8.0f}us{allocated:>8}{change:>14}", file=file)
+
+
+def main():
+    """ Runs the benchmarks given on the command line and compares them
+        with the baseline. """
+    parser = argparse.ArgumentParser(description="Benchmarks the frame hot path.")
+    parser.add_argument("-k", dest="pattern", default="",
+                        help="run only benchmarks whose names contain this")
+    parser.add_argument("--output", default="benchmark.json", help="where to write the results")
+    parser.add_argument("--baseline", default=BASELINE, help="the results to compare with")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.mixer.quit() # sounds are not part of the measured work
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), getattr(pygame, "HIDDEN", 0))
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        if args.pattern in benchmark.name:
+            results[benchmark.name] = summarize(measure(benchmark))
+            results[benchmark.name]["allocated"] = allocations(benchmark)
+
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        baseline = {}
+    ratios, slower = compare(results, baseline, args.threshold)
+    report(results, ratios)
+
+    output = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.platform(),
+        },
+        "results": results,
+    }
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(output, file, indent=4)
+
+    if slower and not args.save_baseline:
+        print(f"slower than the baseline: {', '.join(slower)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,34 +3,34 @@
 
 import abc
 import random
-import os
 import math
 
 import pygame
 
 import events
+from assets import Image
+from audio import Sound
+from pools import Pool, Pooled
 from main import SCREEN_HEIGHT, MARGIN
 from ball import Ball
 
 
 def random_bonus(x0, y0):
     """ Used to roll a bonus after a tile has been hit. """
-    bonus = random.choices(Bonus.types, Bonus.weights)[0](x0, y0)
-    pygame.event.post(pygame.event.Event(events.BONUS_DROPPED, bonus=bonus))
+    bonus = random.choices(Bonus.types, Bonus.weights)[0].get(x0, y0)
+    events.post(events.BonusDropped(bonus))
 
 
-class Bonus(abc.ABC, pygame.sprite.Sprite):
+class Bonus(Pooled, abc.ABC, pygame.sprite.Sprite):
     """ Base Bonus class. Each subclass must be decorated with the register_type
         method in order for the new bonus to appear in the game. This way, each
         bonus has an associated weight used later for picking a random bonus when
         a tile is hit. """
     image = None  # to be specified in subclasses
-    sounds = {"positive": pygame.mixer.Sound(os.path.join("sounds", "positive.wav")),
-              "negative": pygame.mixer.Sound(os.path.join("sounds", "negative.wav"))}
+    sounds = {"positive": Sound("sounds", "positive.wav", volume=0.1, priority=1, voices=2),
+              "negative": Sound("sounds", "negative.wav", volume=0.1, priority=1, voices=2)}
 
-    # sound adjustments
-    sounds["positive"].set_volume(0.1)
-    sounds["negative"].set_volume(0.1)
+    pool = Pool(size=16) # shared by all types, up to size bonuses of each
 
     # used for rolling
     types = []
@@ -49,8 +49,8 @@ class Bonus(abc.ABC, pygame.sprite.Sprite):
     @classmethod
     def on_collect(cls):
         """ Triggered when a bonus is collected. """
-        pygame.event.post(pygame.event.Event(events.POINTS, points=100))
-        pygame.event.post(pygame.event.Event(events.BONUS_COLLECTED, bonus=cls))
+        events.post(events.Points(100))
+        events.post(events.BonusCollected(cls))
 
     @abc.abstractclassmethod
     def take_effect(cls, game):
@@ -58,8 +58,12 @@ class Bonus(abc.ABC, pygame.sprite.Sprite):
 
     def __init__(self, x0, y0):
         pygame.sprite.Sprite.__init__(self)
+        self.reset(x0, y0)
+
+    def reset(self, x0, y0): # pylint: disable=arguments-differ
         self.rect = self.image.get_rect(center=(x0, y0))
         self.v = random.randrange(4, 9)
+        self.previous = None # position before the last update (see Level.sprite_blits)
 
     def update(self):
         self.rect.move_ip(0, self.v)
@@ -74,7 +78,7 @@ class Bonus(abc.ABC, pygame.sprite.Sprite):
 @Bonus.register_type(3)
 class Death(Bonus):
     """ Immediate death. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "death.png"))
+    image = Image("bonuses", "death.png")
 
     @classmethod
     def take_effect(cls, game):
@@ -84,7 +88,7 @@ class Death(Bonus):
 @Bonus.register_type(1)
 class Life(Bonus):
     """ Extra life. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "life.png"))
+    image = Image("bonuses", "life.png")
 
     @classmethod
     def take_effect(cls, game):
@@ -99,11 +103,14 @@ class Life(Bonus):
 @Bonus.register_type(4)
 class SpeedUp(Bonus):
     """ Sets the speed of all balls to the max. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "speedup.png"))
+    image = Image("bonuses", "speedup.png")
 
     @classmethod
     def take_effect(cls, game):
         cls.sounds["negative"].play()
+        if game.lvl.ball_engine == "array":
+            game.lvl.balls.speed_up()
+            return
         for ball in game.lvl.balls:
             v_mag = math.hypot(ball.vx, ball.vy)
             ball.vx = int(ball.MAXSPEED * ball.vx / v_mag)
@@ -113,7 +120,7 @@ class SpeedUp(Bonus):
 @Bonus.register_type(3)
 class FireBall(Bonus):
     """ Whenever a tile is hit, it explodes. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "fireball.png"))
+    image = Image("bonuses", "fireball.png")
 
     @classmethod
     def take_effect(cls, game):
@@ -125,43 +132,44 @@ class FireBall(Bonus):
 @Bonus.register_type(4)
 class Split(Bonus):
     """ Doubles the number of balls. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "split.png"))
+    image = Image("bonuses", "split.png")
 
     @classmethod
     def take_effect(cls, game):
         cls.sounds["positive"].play()
-        new_balls = pygame.sprite.Group()
-        for ball in game.lvl.balls:
-            new_ball = Ball()
+        if game.lvl.ball_engine == "array":
+            game.lvl.balls.split()
+            return
+        balls = game.lvl.balls.sprites()
+        game.lvl.balls.empty() # each new ball goes right after its original
+        for ball in balls:
+            new_ball = Ball.get()
             new_ball.is_attached = ball.is_attached
             if ball.is_attached:
                 game.lvl.paddle.attached_balls.add(new_ball)
             new_ball.rect.center = ball.rect.center
             new_ball.vx, new_ball.vy = -ball.vx, ball.vy
-            new_balls.add(ball)
-            new_balls.add(new_ball)
-        game.lvl.balls = new_balls
+            game.lvl.balls.add(ball, new_ball)
 
 
 ############ paddle ############
 @Bonus.register_type(4)
 class Magnet(Bonus):
     """ The paddle can now capture balls and release them at will. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "magnet.png"))
+    image = Image("bonuses", "magnet.png")
 
     @classmethod
     def take_effect(cls, game):
         cls.sounds["positive"].play()
         paddle = game.lvl.paddle
-        paddle.image = paddle.images["magnetic"]
-        paddle.resize(paddle.len)
         paddle.is_magnetic = True
+        paddle.resize(paddle.len)
 
 
 @Bonus.register_type(5)
 class Enlarge(Bonus):
     """ Doubles the length of the paddle. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "enlarge.png"))
+    image = Image("bonuses", "enlarge.png")
 
     @classmethod
     def take_effect(cls, game):
@@ -173,7 +181,7 @@ class Enlarge(Bonus):
 @Bonus.register_type(5)
 class Shrink(Bonus):
     """ Halves the length of the paddle. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "shrink.png"))
+    image = Image("bonuses", "shrink.png")
 
     @classmethod
     def take_effect(cls, game):
@@ -185,7 +193,7 @@ class Shrink(Bonus):
 @Bonus.register_type(4)
 class Confuse(Bonus):
     """ The paddle moves in the opposite x-direction to the mouse. """
-    image = pygame.image.load(os.path.join("images", "bonuses", "confuse.png"))
+    image = Image("bonuses", "confuse.png")
 
     @classmethod
     def take_effect(cls, game):
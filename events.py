@@ -1,12 +1,69 @@
-# pylint: disable=no-member
-""" Module contating user-defined events. """
+""" Module containing gameplay events and the bus they are sent through.
+    The bus lives in the process, so the game logic doesn't need a display
+    and events don't have to go through the SDL event queue. """
 
-import pygame
+import collections
 
 
-BONUS_DROPPED = pygame.USEREVENT + 1  # attributes: bonus
-BONUS_COLLECTED = pygame.USEREVENT + 2  # attributes: bonus
-POINTS = pygame.USEREVENT + 3  # attributes: points
-EXPLOSION = pygame.USEREVENT + 4 # attributes: where
-DEATH = pygame.USEREVENT + 5
-GAME_OVER = pygame.USEREVENT + 6  # attributes: won
+BonusDropped = collections.namedtuple("BonusDropped", ["bonus"])
+BonusCollected = collections.namedtuple("BonusCollected", ["bonus"])
+Points = collections.namedtuple("Points", ["points"])
+Explosion = collections.namedtuple("Explosion", ["where"])
+Death = collections.namedtuple("Death", [])
+GameOver = collections.namedtuple("GameOver", ["won"])
+
+
+class Bus:
+    """ Class representing an event bus. Posted events are queued and, once
+        per frame, dispatched in one batch to the handlers subscribed to their
+        types, in the order in which they have been posted. All points posted
+        between two dispatches are added up into a single Points event. """
+
+    def __init__(self):
+        self.queue = []
+        self.points = None # points posted since the last dispatch
+        self.handlers = collections.defaultdict(list) # event type -> handlers
+
+    def subscribe(self, event_type, handler):
+        """ Calls handler with every dispatched event of type event_type. """
+        self.handlers[event_type].append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        """ Stops calling handler with the events of type event_type. """
+        self.handlers[event_type].remove(handler)
+
+    def post(self, event):
+        """ Queues event until the next dispatch. """
+        if isinstance(event, Points):
+            self.points = event.points + (self.points or 0)
+        else:
+            self.queue.append(event)
+
+    def get(self):
+        """ Removes all queued events from the bus and returns them. """
+        pending = self.queue
+        if self.points is not None:
+            pending.append(Points(self.points))
+        self.queue = []
+        self.points = None
+        return pending
+
+    def dispatch(self):
+        """ Passes all queued events to their handlers. Events posted by the
+            handlers are left for the next dispatch. """
+        for event in self.get():
+            for handler in self.handlers[type(event)]:
+                handler(event)
+
+
+bus = Bus() # the bus of the game currently being played
+
+
+def post(event):
+    """ Posts event to the current bus. """
+    bus.post(event)
+
+
+def get():
+    """ Removes all queued events from the current bus and returns them. """
+    return bus.get()
@@ -1,34 +1,38 @@
 # pylint: disable=missing-function-docstring,invalid-name
 """ Module defining the Explosion class. """
 
-import os
 
 import pygame
 
+from assets import Images
+from audio import Sound
+from pools import Pool, Pooled
 
-class Explosion(pygame.sprite.Sprite):
+
+class Explosion(Pooled, pygame.sprite.Sprite):
     """ Class representing a visual/acustic explosion. """
-    images = [
-        pygame.image.load(os.path.join("images", "explosion", f"{i}.png")) for i in range(1, 7)
-    ]
-    sound = pygame.mixer.Sound(os.path.join("sounds", "explode.wav"))
+    images = Images([("explosion", f"{i}.png") for i in range(1, 7)])
+    sound = Sound("sounds", "explode.wav", volume=0.1, voices=3)
 
-    sound.set_volume(0.1)
+    FRAMES = 15 # duration of the animation (250 ms at 60 FPS)
+    pool = Pool(size=256) # a blast chained over the whole grid
 
     def __init__(self, x, y, mute=False):
         pygame.sprite.Sprite.__init__(self)
+        self.reset(x, y, mute)
 
+    def reset(self, x, y, mute=False): # pylint: disable=arguments-differ
         self.image = self.images[0]
         self.rect = self.image.get_rect(center=(x, y))
 
-        self.timer = pygame.time.get_ticks()
+        self.frame = 0
         if not mute:
             self.sound.play()
 
     def update(self):
         """ Animation of the explosion. """
-        dt = pygame.time.get_ticks() - self.timer
-        i = int(6 * dt // 250)
+        self.frame += 1
+        i = len(self.images) * self.frame // self.FRAMES
         if i < len(self.images):
             self.image = self.images[i]
         else:
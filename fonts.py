@@ -1,12 +1,67 @@
-""" Module initializing fonts. """
+# pylint: disable=no-member
+""" Module initializing fonts. Each font is loaded on first access. Rendered
+    texts are cached, so that a text drawn every frame is rasterised once. """
 
+import functools
 import os
 
 import pygame
 
-pygame.font.init()
-
 path = os.path.join("misc", "chalk.ttf")
-title_font = pygame.font.Font(path, 200)
-message_font = pygame.font.Font(path, 72)
-regular_font = pygame.font.Font(path, 48)
+sizes = {"title_font": 200, "message_font": 72, "regular_font": 48, "small_font": 24}
+
+
+def __getattr__(name):
+    if name not in sizes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if not pygame.font.get_init():
+        pygame.font.init()
+    font = pygame.font.Font(path, sizes[name])
+    globals()[name] = font
+    return font
+
+
+def get(name):
+    """ Returns the font called name, loading it if needed. Fonts loaded
+        before the font module was shut down (pygame.quit) are reloaded. """
+    if not pygame.font.get_init():
+        for loaded in sizes:
+            globals().pop(loaded, None)
+        cached_render.cache_clear()
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def render(font, text, color="white"):
+    """ Returns the (antialiased) text rendered with the font named font,
+        e.g. "regular_font". The result is cached and must not be modified. """
+    return cached_render(font, text, tuple(pygame.Color(color)))
+
+
+@functools.lru_cache(maxsize=256)
+def cached_render(font, text, color, background=None):
+    """ Returns the text rendered with the font named font, the color given
+        as a tuple (see render), or the cached surface of a former call. """
+    return get(font).render(text, True, color, background)
+
+
+def number(font, value, color="white"):
+    """ Returns value rendered with the font named font. The number is put
+        together from cached digit glyphs instead of being rasterised. """
+    glyphs = [render(font, digit, color) for digit in str(value)]
+    width = sum(glyph.get_width() for glyph in glyphs)
+    height = max(glyph.get_height() for glyph in glyphs)
+    text = pygame.Surface((width, height), pygame.SRCALPHA) # pylint: disable=too-many-function-args
+    x = 0
+    for glyph in glyphs:
+        text.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        x += glyph.get_width()
+    return text
+
+
+def fade(font, text, alpha):
+    """ Returns white text on a black background with the given transparency,
+        used for texts fading in and out on a black screen. The same cached
+        surface is returned for all values of alpha. """
+    surface = cached_render(font, text, (255, 255, 255), (0, 0, 0))
+    surface.set_alpha(alpha)
+    return surface
@@ -1,18 +1,23 @@
 # pylint: disable=missing-function-docstring,missing-class-docstring,invalid-name,no-member
 """ Module defining the high-level Game class. """
 
-import time
 import os
 import sys
 import math
-import pickle
+import datetime
 
 import pygame
 
-import events
-from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
-from fonts import title_font, message_font, regular_font
+import fonts
+import inputs
+from assets import Image
+from audio import Music
 from level import Level
+from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN, DIRTY_RECTS, FPS, MAX_FPS
+from replay import Recording
+from scores import ScoreStore
+from simulation import Simulation
+from timers import scheduler
 
 
 class Game:
@@ -20,16 +25,24 @@ class Game:
         which represents a concrete state of a game: start screen, running
         game, transition from running game to ranking, or ranking. Event loops
         are used to change the state attribute. """
-    music = pygame.mixer.Sound(os.path.join("sounds", "menu.wav"))
-    ranking_path = os.path.join("misc", "rank.pkl")
-
-    def __init__(self, *, start_lvl=1):
+    music = Music("sounds", "menu.wav")
+    ranking_path = os.path.join("misc", "scores.db")
+    legacy_ranking_path = os.path.join("misc", "rank.pkl") # imported into ranking_path
+    ranking_size = 5 # number of scores shown in the ranking
+    idle_timeout = 1000 # ms between the frames of a static screen without input
+    attract_fps = 30 # frame rate of the start screen once its title is shown
+
+    def __init__(self, *, start_lvl=1, record=None):
         self.state = Game.StartScreen()
         self.start_lvl = start_lvl
+        self.record = record # where to save recordings of the games (see replay)
 
-    def draw(self, surface):
-        """ Draws the current state of a game. """
-        self.state.draw(surface)
+    def draw(self, surface, alpha=1.0):
+        """ Draws the current state of a game. Returns the list of changed
+            rects or None if the whole surface should be updated. alpha is
+            the fraction of the next update that has elapsed, moving sprites
+            are drawn that far between their last two positions. """
+        return self.state.draw(surface, alpha)
 
     def update(self):
         """ Updates the state of all changing elements of self. state
@@ -39,44 +52,63 @@ class Game:
     def eventloop(self):
         self.state.eventloop(self)
 
+    def idle(self):
+        """ Returns how long (in ms) the main loop may wait for input before
+            the next frame, 0 if the current state needs every frame. """
+        return self.state.idle()
+
+    def invalidate(self):
+        """ Makes the next draw repaint the whole surface, e.g. after
+            something else has been drawn over it. """
+        self.state.invalidate()
+
+    def max_fps(self):
+        """ Returns how many frames per second the current state may be
+            drawn at most. Only the running game draws the sprites between
+            the steps (see Level.sprite_blits), the other states can't
+            change more often than they are updated. """
+        return self.state.max_fps
+
     class StartScreen:
+        max_fps = FPS
+
         def __init__(self):
-            self.timer = pygame.time.get_ticks()
-            if not pygame.mixer.get_busy():
-                self.base_volume = 0
-                Game.music.play(loops=-1)
-            else:
-                self.base_volume = Game.music.get_volume()
-
-        def draw(self, surface):
+            self.title = scheduler.tween(0, 255, 2000)
+            # the instruction pulses once every 1000 * pi ms
+            self.pulse = scheduler.tween(-math.pi / 2, 3 * math.pi / 2, 1000 * math.pi,
+                                         delay=2000, repeat=True)
+            Game.music.play()
+
+        def draw(self, surface, alpha=1.0): # pylint: disable=unused-argument
             # background
             surface.fill(pygame.Color("black"))
 
-            # get time
-            dt = pygame.time.get_ticks() - self.timer
-
             # title
-            c = min(int(255 * dt / 2000), 255)
-            text = title_font.render("BALL-Z", True, (c, c, c))
+            text = fonts.fade("title_font", "BALL-Z", int(self.title.value))
             x = SCREEN_WIDTH // 2 - text.get_width() // 2
             y = (SCREEN_HEIGHT // 2 - text.get_height() // 2) // 2
             surface.blit(text, (x, y))
 
             # instruction
-            if dt > 2000:
-                c = 150 + int(100 * math.sin((dt - 2000 - 250*math.pi) / 500))
-                text = regular_font.render("Left Click to Start", True, (c, c, c))
+            if self.pulse.started:
+                c = 150 + int(100 * math.sin(self.pulse.value))
+                text = fonts.fade("regular_font", "Left Click to Start", c)
                 x = SCREEN_WIDTH // 2 - text.get_width() // 2
                 y = 3 * SCREEN_HEIGHT // 4
                 surface.blit(text, (x, y))
 
         def update(self):
-            # volume
-            dt = pygame.time.get_ticks() - self.timer
-            Game.music.set_volume(self.base_volume + (dt / 6000) ** 2)
+            pass # the music fades in by itself
+
+        def invalidate(self):
+            pass # the whole screen is drawn every frame
+
+        def idle(self):
+            # only the instruction pulses slowly
+            return 1000 // Game.attract_fps if self.title.done else 0
 
         def eventloop(self, game): # pylint: disable=no-self-use
-            pygame.mouse.get_rel()
+            inputs.mouse.clear()
             for event in pygame.event.get():
                 if event.type == pygame.KEYUP:
                     if event.key == pygame.K_ESCAPE:
@@ -86,163 +118,260 @@ class Game:
                         game.state = Game.Ranking()
                 elif event.type == pygame.MOUSEBUTTONUP:
                     Game.music.fadeout(1000)
-                    game.state = Game.RunningGame(game.start_lvl)
-
-    class RunningGame:
-        margin = pygame.image.load(os.path.join("images", "margin.png"))
-
-        def __init__(self, start_lvl=1):
-            self.n_lvl = start_lvl # the current level number
-            self.lvl = Level(self.n_lvl) # the current level object
-            self.lives = 2 # lives left
-            self.score = 0 # points
-
-        def draw(self, surface):
-            # background
-            surface.fill(pygame.Color("black"))
+                    game.state = Game.RunningGame(game.start_lvl, record=game.record)
+
+    class RunningGame(Simulation): # pylint: disable=too-many-instance-attributes
+        margin = Image("margin.png")
+        dirty_rects = DIRTY_RECTS
+        max_fps = MAX_FPS
+        death_delay = 1000 # ms during which the screen stands still after a death
+
+        def __init__(self, start_lvl=1, record=None):
+            self.record = record
+            self.recording = None
+            if record is not None:
+                self.recording = Recording(start_lvl)
+                self.recording.start()
+            self.inputs = (0, False) # clicks and pause toggle of the current frame
+            self.thawing = None # Timer ending the freeze after a death, see frozen
+            self.held = False # whether the current step is skipped
+
+            Simulation.__init__(self, start_lvl)
+
+            self.background = None # black background with margins and texts
+            self.texts = None # (score, lives) drawn on the background
+            self.text_rects = []
+
+        def draw(self, surface, alpha=1.0):
+            if self.frozen:
+                # the last frame before the death stays on the screen; the
+                # movements are dropped (see update), so they aren't measured
+                inputs.mouse.clear()
+                return []
+            self.lvl.lookahead = inputs.mouse.pending()
+            inputs.mouse.drawn()
+            damaged = self.draw_background(surface)
+            if self.dirty_rects:
+                return self.lvl.draw_dirty(surface, self.background, damaged, alpha)
 
-            # margins
-            surface.blit(self.margin, (MARGIN - 30, 0))
-            surface.blit(self.margin, (SCREEN_WIDTH - MARGIN, 0))
+            # balls, tiles, paddle, bonuses
+            self.lvl.draw(surface, self.background, damaged, alpha)
+            return None
+
+        def draw_background(self, surface):
+            """ Keeps the background (margins, lives and score) up to date
+                and returns the list of its changed rects. """
+            damaged = []
+            if self.background is None:
+                self.background = pygame.Surface(surface.get_size())
+                self.background.fill(pygame.Color("black"))
+
+                # margins
+                self.background.blit(self.margin, (MARGIN - 30, 0))
+                self.background.blit(self.margin, (SCREEN_WIDTH - MARGIN, 0))
+
+            # lives and score are re-rendered only when they change
+            if self.texts != (self.score, self.lives):
+                for rect in self.text_rects:
+                    self.background.fill(pygame.Color("black"), rect)
+                damaged.extend(self.text_rects)
+                self.text_rects = self.draw_texts(self.background)
+                damaged.extend(self.text_rects)
+                self.texts = (self.score, self.lives)
+            return damaged
+
+        def draw_texts(self, surface):
+            """ Draws lives and score and returns their rects. """
+            rects = []
 
             # lives
             if self.lives > 0:
                 lives = "I" * self.lives
-                text = regular_font.render(lives, True, pygame.Color("white"))
-                surface.blit(text, (SCREEN_WIDTH - MARGIN - 10 - text.get_width(), 1))
+                text = fonts.render("regular_font", lives)
+                x = SCREEN_WIDTH - MARGIN - 10 - text.get_width()
+                rects.append(surface.blit(text, (x, 1)))
 
             # score
-            text = regular_font.render(str(self.score), True, pygame.Color("white"))
-            surface.blit(text, (MARGIN + 10, 1))
-
-            # balls, tiles, paddle, bonuses
-            self.lvl.draw(surface)
+            text = fonts.number("regular_font", self.score)
+            rects.append(surface.blit(text, (MARGIN + 10, 1)))
+            return rects
+
+        def invalidate(self):
+            self.lvl.drawn = None
+
+        def idle(self):
+            # nothing moves while the game waits for a click or the end of the pause
+            lvl = self.lvl
+            if (lvl.paused or lvl.finished) and not lvl.explosions and not self.frozen:
+                return Game.idle_timeout
+            return 0
+
+        @property
+        def frozen(self):
+            """ Whether the game stands still after a death. The death itself
+                is handled right away, as in a Simulation, but the steps are
+                skipped (and not recorded) until the freeze ends. """
+            return self.thawing is not None
+
+        def thaw(self):
+            self.thawing = None
 
         def update(self):
-            self.lvl.update()
+            dx = inputs.mouse.take()
+            if self.held:
+                return
+            clicks, pause = self.inputs
+            self.inputs = (0, False)
+            if self.recording is not None:
+                self.recording.record(dx, clicks, pause)
+
+            self.activate()
+            self.lvl.update(dx=dx)
+            if self.lvl.finished and self.prefetch:
+                self.prefetch_level()
 
         def on_death(self):
-            """ Triggered when player loses all balls. """
-            self.lvl.on_death()
-            self.lives -= 1
-            if self.lives < 0:
-                pygame.event.post(pygame.event.Event(events.GAME_OVER, won=False))
-
-        def next_level(self):
-            """ Triggered when player finishes the current level. """
-            self.n_lvl += 1
-            try:
-                self.lvl = Level(self.n_lvl)
-            except FileNotFoundError:
-                pygame.event.post(pygame.event.Event(events.GAME_OVER, won=True))
+            Simulation.on_death(self)
+            if self.lvl.n != 0:
+                self.thawing = scheduler.after(self.death_delay, self.thaw)
 
         def eventloop(self, game):
-            # pylint: disable=too-many-branches
+            clicks, pause = 0, False
             for event in pygame.event.get():
                 if event.type == pygame.KEYUP:
                     if event.key == pygame.K_ESCAPE:
+                        if self.frozen:
+                            self.thawing.cancel()
+                        self.save_recording()
                         game.state = Game.StartScreen()
-                    elif not self.lvl.finished and event.key == pygame.K_p:
-                        self.lvl.paused = not self.lvl.paused
+                    elif event.key == pygame.K_p:
+                        pause = not pause
                 elif event.type == pygame.MOUSEBUTTONUP:
-                    if self.lvl.finished:
-                        self.next_level()
-                    else:
-                        for ball in self.lvl.paddle.attached_balls:
-                            ball.on_hit(self.lvl.paddle)
-                        self.lvl.paddle.attached_balls.clear()
-                elif event.type == events.BONUS_DROPPED:
-                    self.lvl.bonuses.add(event.bonus)
-                elif event.type == events.BONUS_COLLECTED:
-                    event.bonus.take_effect(self)
-                elif event.type == events.POINTS:
-                    self.score += event.points
-                elif event.type == events.EXPLOSION:
-                    self.lvl.explosion(*event.where)
-                elif event.type == events.DEATH:
-                    self.on_death()
-                elif event.type == events.GAME_OVER:
-                    final_score = self.score + (self.n_lvl - 1) * 1000
-                    game.state = Game.RankingTransition(final_score, won=event.won)
-
-    class RankingTransition:
+                    clicks += 1
+                elif event.type == pygame.MOUSEMOTION:
+                    inputs.mouse.add(event)
+
+            # a step started during the freeze is skipped, the one in which
+            # the death is handled goes on
+            self.held = self.frozen
+            if self.held:
+                return
+
+            # the same order as in Simulation.step, so that recordings replay exactly
+            self.inputs = (clicks, pause)
+            if pause:
+                self.toggle_pause()
+            for _ in range(clicks):
+                self.click()
+
+            # gameplay events
+            self.activate()
+            self.bus.dispatch()
+            if self.over:
+                # the last frame isn't updated, so it is recorded here
+                if self.recording is not None:
+                    self.recording.record(0, clicks, pause)
+                self.save_recording()
+                game.state = Game.RankingTransition(self.final_score, won=self.won)
+
+        def save_recording(self):
+            if self.recording is not None:
+                self.recording.save(self.record)
+
+    class RankingTransition: # pylint: disable=too-many-instance-attributes
+        max_fps = FPS
+
         def __init__(self, score, won):
             self.score = score
             self.title = "All Levels Cleared!" if won else "Good Luck Next Time!"
-            try:
-                with open(Game.ranking_path, "rb") as f:
-                    self.ranking = pickle.load(f)
-            except (FileNotFoundError, EOFError):
-                self.ranking = []
-                self.ask_name = True
-            else:
-                self.ask_name = len(self.ranking) < 5 or self.ranking[-1][1] < self.score
+            self.store = ScoreStore(Game.ranking_path, legacy=Game.legacy_ranking_path)
+            self.pack = os.path.basename(Level.pack) # scores are kept per level pack
+            self.ranking = self.store.top(self.pack, Game.ranking_size)
+            self.ask_name = len(self.ranking) < Game.ranking_size or self.ranking[-1][1] < score
             self.name = ""
 
-            self.timer = pygame.time.get_ticks()
-            Game.music.play(loops=-1)
+            self.fade = scheduler.tween(0, 255, 3000) # of the title
+            self.cursor = scheduler.tween(0, 2, 1000, delay=4000, repeat=True) # visible from 1 to 2
+            self.stage = 0 # number of shown lines below the title
+            for delay in (3000, 3500, 4000):
+                scheduler.after(delay, self.show_next)
+            self.finished = False # whether to move on to the ranking
+            if not self.ask_name:
+                scheduler.after(5000, self.finish)
+            Game.music.play(restart=True)
+
+        def show_next(self):
+            self.stage += 1
+
+        def finish(self):
+            self.finished = True
 
-        def draw(self, surface):
+        def draw(self, surface, alpha=1.0): # pylint: disable=unused-argument
             # background
             surface.fill(pygame.Color("black"))
 
-            # time
-            dt = pygame.time.get_ticks() - self.timer
-
             # title
-            c = min(int(255 * dt / 3000), 255)
-            text = message_font.render(self.title, True, (c, c, c))
+            text = fonts.fade("message_font", self.title, int(self.fade.value))
             x = (SCREEN_WIDTH - text.get_width()) // 2
             y = (SCREEN_HEIGHT - text.get_height()) // 8
             surface.blit(text, (x, y))
 
-            if dt > 3000:
-                text = regular_font.render("Final Score:", True, pygame.Color("white"))
+            if self.stage >= 1:
+                text = fonts.render("regular_font", "Final Score:")
                 x = (SCREEN_WIDTH - text.get_width()) // 4
                 y = (SCREEN_HEIGHT - text.get_height()) // 3 + 100
                 surface.blit(text, (x, y))
 
-            if dt > 3500:
-                text = regular_font.render(str(self.score), True, pygame.Color("white"))
+            if self.stage >= 2:
+                text = fonts.number("regular_font", self.score)
                 x = 2 * SCREEN_WIDTH // 3
                 y = (SCREEN_HEIGHT - text.get_height()) // 3 + 100
                 surface.blit(text, (x, y))
 
-            if dt > 4000:
-                if self.ask_name:
-                    text = regular_font.render("Your Name", True, pygame.Color("white"))
-                    x = (SCREEN_WIDTH - text.get_width()) // 4
-                    y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
-                    surface.blit(text, (x, y))
-
-                    text = regular_font.render(self.name, True, pygame.Color("white"))
-                    x = 2 * SCREEN_WIDTH // 3
-                    y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
-                    surface.blit(text, (x, y))
-
-                    col = pygame.Color("black") if (dt // 500) % 2 == 0 else pygame.Color("white")
-                    dot = regular_font.render(".", True, col)
-                    x = 2 * SCREEN_WIDTH // 3 + text.get_width() + dot.get_width()
-                    y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
-                    surface.blit(dot, (x, y))
-                else:
-                    time.sleep(1)
-                    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_RETURN))
+            if self.stage >= 3 and self.ask_name:
+                text = fonts.render("regular_font", "Your Name")
+                x = (SCREEN_WIDTH - text.get_width()) // 4
+                y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
+                surface.blit(text, (x, y))
+
+                text = fonts.render("regular_font", self.name)
+                x = 2 * SCREEN_WIDTH // 3
+                y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
+                surface.blit(text, (x, y))
+
+                col = pygame.Color("white") if self.cursor.value >= 1 else pygame.Color("black")
+                dot = fonts.render("regular_font", ".", col)
+                x = 2 * SCREEN_WIDTH // 3 + text.get_width() + dot.get_width()
+                y = 2 * (SCREEN_HEIGHT - text.get_height()) // 3
+                surface.blit(dot, (x, y))
 
         def update(self):
-            # volume
-            dt = pygame.time.get_ticks() - self.timer
-            Game.music.set_volume((dt / 6000) ** 2)
+            pass # the music fades in by itself
+
+        def invalidate(self):
+            pass # the whole screen is drawn every frame
+
+        def idle(self):
+            # once the title has faded in, only the next stage (see
+            # show_next) and the blinking cursor change the screen
+            if not self.fade.done:
+                return 0
+            timeout = scheduler.until_next()
+            if timeout is None:
+                timeout = Game.idle_timeout
+            if self.ask_name and self.stage >= 3:
+                blink = self.cursor.duration // 2 # the cursor is shown in the second half
+                timeout = min(timeout, blink - (scheduler.now - self.cursor.begin) % blink)
+            return timeout
 
         def update_ranking(self):
-            self.ranking.append((self.name, self.score))
-            self.ranking.sort(key=lambda el: el[1], reverse=True)
-            while len(self.ranking) > 5:
-                self.ranking.pop()
-            with open(Game.ranking_path, "wb") as f:
-                pickle.dump(self.ranking, f)
+            self.store.add(self.name, self.score, self.pack)
+            self.ranking = self.store.top(self.pack, Game.ranking_size)
 
         def eventloop(self, game):
+            if self.finished:
+                game.state = Game.Ranking()
+                return
             for event in pygame.event.get():
                 if event.type == pygame.KEYUP:
                     if event.key == pygame.K_ESCAPE:
@@ -260,56 +389,61 @@ class Game:
                             pass
 
     class Ranking:
-        def __init__(self):
-            try:
-                with open(Game.ranking_path, "rb") as f:
-                    self.ranking = pickle.load(f)
-            except (FileNotFoundError, EOFError):
-                self.ranking = []
+        max_fps = FPS
+
+        def __init__(self, today=False):
+            self.today = today # whether to show the best scores of today only
+            day = datetime.date.today().isoformat() if today else None
+            store = ScoreStore(Game.ranking_path, legacy=Game.legacy_ranking_path)
+            self.ranking = store.top(os.path.basename(Level.pack), Game.ranking_size, day)
             self.drawn = False
 
-            self.timer = pygame.time.get_ticks()
-            if not pygame.mixer.get_busy():
-                self.base_volume = 0
-                Game.music.play(loops=-1)
-            else:
-                self.base_volume = Game.music.get_volume()
+            Game.music.play()
 
         def update(self):
-            # volume
-            dt = pygame.time.get_ticks() - self.timer
-            Game.music.set_volume(self.base_volume + (dt / 6000) ** 2)
-
-        def draw(self, surface):
-            if not self.drawn:
-                # background
-                surface.fill(pygame.Color("black"))
-
-                # title
-                text = message_font.render("Best Scores", True, pygame.Color("white"))
-                x = (SCREEN_WIDTH - text.get_width()) // 2
-                y = 50
-                surface.blit(text, (x, y))
+            pass # the music fades in by itself
 
-                # ranking
-                for i, (name, score) in enumerate(self.ranking):
-                    text = regular_font.render(f"{i + 1}.", True, pygame.Color("white"))
-                    x = 50
-                    y = (SCREEN_HEIGHT - text.get_height()) // 3 + i * 100
-                    surface.blit(text, (x, y))
+        def invalidate(self):
+            self.drawn = False
 
-                    text = regular_font.render(name, True, pygame.Color("white"))
-                    x = 150
-                    surface.blit(text, (x, y))
+        def idle(self):
+            return Game.idle_timeout if self.drawn else 0
 
-                    text = regular_font.render(str(score), True, pygame.Color("white"))
-                    x = SCREEN_WIDTH - text.get_width() - 50
-                    surface.blit(text, (x, y))
+        def draw(self, surface, alpha=1.0): # pylint: disable=unused-argument
+            if self.drawn:
+                return [] # nothing has changed
 
-                self.drawn = True
+            # background
+            surface.fill(pygame.Color("black"))
 
-        def eventloop(self, game): # pylint: disable=no-self-use
+            # title
+            text = fonts.render("message_font", "Today's Best" if self.today else "Best Scores")
+            x = (SCREEN_WIDTH - text.get_width()) // 2
+            y = 50
+            surface.blit(text, (x, y))
+
+            # ranking
+            for i, (name, score) in enumerate(self.ranking):
+                text = fonts.render("regular_font", f"{i + 1}.")
+                x = 50
+                y = (SCREEN_HEIGHT - text.get_height()) // 3 + i * 100
+                surface.blit(text, (x, y))
+
+                text = fonts.render("regular_font", name)
+                x = 150
+                surface.blit(text, (x, y))
+
+                text = fonts.number("regular_font", score)
+                x = SCREEN_WIDTH - text.get_width() - 50
+                surface.blit(text, (x, y))
+
+            self.drawn = True
+            return None
+
+        def eventloop(self, game):
             for event in pygame.event.get():
-                if (event.type == pygame.MOUSEBUTTONUP or event.type == pygame.KEYUP
-                    and (event.key == pygame.K_ESCAPE or event.key == pygame.K_r)):
+                if event.type == pygame.KEYUP and event.key == pygame.K_t:
+                    game.state = Game.Ranking(today=not self.today)
+                elif (event.type == pygame.MOUSEBUTTONUP or event.type == pygame.KEYUP
+                      and (event.key == pygame.K_ESCAPE or event.key == pygame.K_r)):
                     game.state = Game.StartScreen()
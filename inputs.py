@@ -0,0 +1,68 @@
+# pylint: disable=missing-function-docstring,no-member
+""" Module collecting the mouse movements which move the paddle. While a
+    game is running, its event loop takes the movements from the event
+    queue before each step and the main loop polls the mouse again right
+    before drawing, so the movements which arrive in between are still
+    shown (see Level.lookahead). It also measures the input latency: the
+    time from polling a movement until the frame showing it has been
+    flipped. """
+
+import time
+
+import pygame
+
+import timing
+
+
+class Mouse:
+    """ Class representing the horizontal mouse movements which haven't
+        moved the paddle yet, with the times when they have been polled.
+        SDL events don't carry usable timestamps in pygame, so a movement is
+        stamped when it is taken from the queue, i.e. at most half a frame
+        after it has happened. """
+
+    def __init__(self):
+        self.motions = [] # (time, dx) not taken yet
+        self.unshown = None # time of the oldest movement not drawn yet
+        self.drawn_at = None # time of the oldest movement in the drawn frame
+
+    def poll(self):
+        """ Takes the MOUSEMOTION events from the event queue. """
+        for event in pygame.event.get(pygame.MOUSEMOTION):
+            self.add(event)
+
+    def add(self, event):
+        now = time.perf_counter()
+        self.motions.append((now, event.rel[0]))
+        if self.unshown is None:
+            self.unshown = now
+
+    def pending(self):
+        """ Returns the movement not taken yet. """
+        return sum(dx for _, dx in self.motions)
+
+    def take(self):
+        """ Returns the movement not taken yet and forgets it. """
+        dx = self.pending()
+        self.motions.clear()
+        return dx
+
+    def clear(self):
+        self.motions.clear()
+        self.unshown = self.drawn_at = None
+
+    def drawn(self):
+        """ Marks all movements so far as drawn. """
+        if self.drawn_at is None:
+            self.drawn_at = self.unshown
+        self.unshown = None
+
+    def flipped(self):
+        """ Records the latency of the oldest movement shown by the frame
+            which has just been flipped (see timing.record). """
+        if self.drawn_at is not None:
+            timing.record("latency", 1000 * (time.perf_counter() - self.drawn_at))
+            self.drawn_at = None
+
+
+mouse = Mouse() # the mouse of the running game
@@ -1,18 +1,21 @@
 # pylint: disable=invalid-name,missing-function-docstring
 """ Module containing the Level class. """
 
+import collections
+import math
 import os
-import time
-import pickle
 
 import pygame
 
 import events
+import fonts
+import levelpack
+import timing
+from audio import Sound
 from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
-from fonts import message_font
 from ball import Ball
 from paddle import Paddle
-from tiles import Tile, Brick
+from tiles import Tile, TileGroup, WIDTH, HEIGHT
 from explosion import Explosion
 
 
@@ -20,33 +23,59 @@ class Level: # pylint: disable=too-many-instance-attributes
     """ Class representing a level. It keeps track of all sprites:
         balls, the paddle, tiles, explosions and bonuses. """
     sounds = {
-        "death": pygame.mixer.Sound(os.path.join("sounds", "death.wav")),
-        "next_level": pygame.mixer.Sound(os.path.join("sounds", "next_level.wav")),
+        "death": Sound("sounds", "death.wav", priority=2, reserved=True),
+        "next_level": Sound("sounds", "next_level.wav", priority=2, reserved=True),
     }
 
-    def __init__(self, n):
+    # ball vs. tile collision detection: "grid" looks up only the cells
+    # overlapped by a ball, "sprite" checks every tile (only with the
+    # "sprite" tile engine, see tile_engine)
+    broadphase = "grid"
+
+    # "sprite" - each ball is a Ball sprite, "array" - all balls are kept
+    # in a BallArray (requires NumPy, meant for very large numbers of balls)
+    ball_engine = "sprite"
+
+    # "sprite" - each tile is a Tile sprite, "grid" - the tiles are kept in
+    # a TileGrid and become sprites only when reached (requires NumPy,
+    # meant for simulations of very many levels)
+    tile_engine = "sprite"
+
+    pack = os.path.join("levels", "levels.pack") # where the levels are read from
+
+    SUBSTEP = 8 # max distance (in px, along each axis) a ball moves between collision checks
+
+    # whether the paddle moves along with the balls in substeps, so that
+    # fast paddle movements hit the balls where they are crossed; it
+    # changes the game, recordings replay only with the same setting
+    paddle_substeps = False
+
+    def __init__(self, n, record=None):
+        """ Raises KeyError if there is no level n in the pack.
+
+            Parameters
+                record: levelpack.Record - the layout of the level, if it
+                    has been read already (see read) """
+        Ball.reset_state()
         self.paddle = Paddle()
-        self.balls = pygame.sprite.Group()
-        ball = Ball()
-        self.balls.add(ball)
-        self.paddle.attached_balls.add(ball)
-
-        self.tile_matrix = [[None for _ in range(16)] for _ in range(16)]
-        self.tiles = pygame.sprite.Group()
-        if n != 0:  # case n = 0 is used for testing
-            with open(os.path.join("levels", f"{n}.pkl"), "rb") as file:
-                file = pickle.load(file)
-                for line in file.split("\n"):
-                    try:
-                        j, i, alias = line.split()
-                        if alias not in Tile.types:
-                            raise RuntimeError(f"invalid tile type: {alias}")
-                        i, j = int(i), int(j)
-                        tile = Tile.types[alias](MARGIN + 60 * i, 3 * MARGIN + 30 * j)
+        self.balls = None
+        self.reset_balls()
+
+        if n != 0 and record is None:  # case n = 0 is used for testing
+            record = self.read(n)
+        if self.tile_engine == "grid":
+            from tile_grid import TileGrid # pylint: disable=import-outside-toplevel
+            self.tile_matrix = None # cells are looked up in the grid
+            self.tiles = TileGrid() if record is None else TileGrid.from_record(record)
+        else:
+            self.tile_matrix = [[None for _ in range(16)] for _ in range(16)]
+            self.tiles = TileGroup()
+            for i, column in enumerate(record.grid if record is not None else ()):
+                for j, alias in enumerate(column):
+                    if alias is not None:
+                        tile = Tile.types[alias](MARGIN + WIDTH * i, 3 * MARGIN + HEIGHT * j)
                         self.tile_matrix[i][j] = tile
                         self.tiles.add(tile)
-                    except (TypeError, ValueError):
-                        pass
 
         self.bonuses = pygame.sprite.Group()
         self.explosions = pygame.sprite.Group()
@@ -54,89 +83,292 @@ class Level: # pylint: disable=too-many-instance-attributes
         self.n = n
         self.finished = False
         self.paused = False
-        Ball.reset_state()
+        self.layer = None # background with all tiles, see bake
+        self.drawn = None # rects of the moving sprites drawn by draw_dirty
+        self.lookahead = 0 # mouse movement not applied yet, shown by the drawn paddle
+        self.blasted = set() # grid cells hit by explosions in the current frame
+
+    @classmethod
+    def read(cls, n):
+        """ Returns the record of level n in the pack. It only decodes the
+            layout, without touching pygame, so it may run in any thread
+            (see Simulation.prefetch_level). Raises KeyError if there is no
+            level n. """
+        return levelpack.get(cls.pack)[n]
 
-    def draw(self, surface):
-        # draw all sprites
-        self.explosions.draw(surface)
-        self.paddle.draw(surface)
-        self.balls.draw(surface)
-        self.tiles.draw(surface)
-        self.bonuses.draw(surface)
+    def draw(self, surface, background, damaged=(), alpha=1.0):
+        """ Draws the whole level on top of background (see bake). Moving
+            sprites are drawn between their previous and current positions,
+            alpha being the fraction of the way (see sprite_blits). """
+        self.bake(background, damaged)
+        surface.blit(self.layer, (0, 0))
+        surface.blits(self.sprite_blits(alpha), False)
 
         # conditional text
+        return self.draw_message(surface)
+
+    def sprite_blits(self, alpha=1.0):
+        """ Returns the (image, position) pairs of all moving sprites in
+            the order in which they are drawn. The simulation advances in
+            fixed steps, so when a frame is drawn between two of them, each
+            sprite is put the fraction alpha of the way from where it was
+            before the last update to where it is now. The paddle follows the
+            mouse instead: it is drawn where the lookahead would move it, and
+            so are the balls attached to it. """
+        def position(sprite):
+            x, y = sprite.rect.topleft
+            if alpha == 1 or sprite.previous is None:
+                return x, y
+            x0, y0 = sprite.previous
+            return round(x0 + alpha * (x - x0)), round(y0 + alpha * (y - y0))
+
+        shift = 0
+        if self.lookahead and not (self.finished or self.paused):
+            shift = self.paddle.reach(self.lookahead)
+
+        blits = [(explosion.image, explosion.rect.topleft) for explosion in self.explosions]
+        blits.append((self.paddle.image, self.paddle.rect.move(shift, 0).topleft))
+        if self.ball_engine == "array":
+            blits.extend(self.balls.blits(alpha, shift))
+        else:
+            blits.extend((ball.image, ball.rect.move(shift, 0).topleft if ball.is_attached
+                          else position(ball)) for ball in self.balls)
+        blits.extend((bonus.image, position(bonus)) for bonus in self.bonuses)
+        return blits
+
+    def draw_message(self, surface):
+        """ Draws the conditional text and returns its rect (if any). """
         if self.finished:
             message = "Level Cleared!"
-            text = message_font.render(message, True, pygame.Color("white"))
-            w, h = text.get_size()
-            x, y = (SCREEN_WIDTH - w) // 2, (SCREEN_HEIGHT - h) // 2
-            surface.blit(text, (x, y))
         elif self.paused:
-            text = message_font.render("Pause", True, pygame.Color("white"))
-            w, h = text.get_size()
-            x, y = (SCREEN_WIDTH - w) // 2, (SCREEN_HEIGHT - h) // 2
-            surface.blit(text, (x, y))
-
-    def update(self):
-        """ Updates the postions of all sprites. """
-        self.paddle.update(paused=self.finished or self.paused)
-        if not (self.finished or self.paused):
-            self.balls.update()
-            self.bonuses.update()
-            if not self.balls:
-                pygame.event.post(pygame.event.Event(events.DEATH))
-            elif all(isinstance(tile, Brick) for tile in self.tiles):
-                self.finished = True
-                self.sounds["next_level"].play()
-            else:
-                self.detect_collisions()
-        self.explosions.update()
+            message = "Pause"
+        else:
+            return None
+        text = fonts.render("message_font", message)
+        w, h = text.get_size()
+        x, y = (SCREEN_WIDTH - w) // 2, (SCREEN_HEIGHT - h) // 2
+        return surface.blit(text, (x, y))
+
+    def bake(self, background, damaged=()):
+        """ Brings the off-screen layer with background and all tiles up to
+            date and returns the list of rects which have changed. Only the
+            rects of killed or changed tiles and the damaged parts of
+            background are repainted.
+
+            Parameters
+                background: pygame.Surface - what is behind the tiles
+                damaged: list of pygame.Rect - changed parts of background """
+        if self.layer is None:
+            self.layer = background.copy()
+            self.layer.blits(self.tiles.blits(), False)
+            self.tiles.damaged.clear()
+            return [self.layer.get_rect()]
+
+        rects = self.tiles.damaged + list(damaged)
+        self.tiles.damaged.clear()
+        for rect in rects:
+            self.layer.set_clip(rect)
+            self.layer.blit(background, (0, 0))
+            self.layer.blits(self.tiles.blits(rect), False)
+        self.layer.set_clip(None)
+        return rects
+
+    def draw_dirty(self, surface, background, damaged=(), alpha=1.0):
+        """ Redraws only what has changed since the previous call and returns
+            the list of changed rects. The rest of the surface is assumed to be
+            left as it was drawn.
+
+            Parameters
+                surface: pygame.Surface - the surface to draw on
+                background: pygame.Surface - what is behind the tiles
+                damaged: list of pygame.Rect - changed parts of background
+                alpha: float - see sprite_blits """
+        changed = self.bake(background, damaged)
+        blits = self.sprite_blits(alpha)
+        # an image may be larger than the rect of its sprite (e.g. explosions)
+        rects = [image.get_rect(topleft=position) for image, position in blits]
+        if self.drawn is None:
+            message = self.draw(surface, background, alpha=alpha)
+            self.drawn = rects
+            if message:
+                self.drawn.append(message)
+            return [surface.get_rect()]
+
+        # areas to repaint: where the sprites were and are, and changed tiles
+        dirty = self.drawn + changed + rects
+        for rect in dirty:
+            surface.blit(self.layer, rect, rect)
+        surface.blits(blits, False)
+
+        message = self.draw_message(surface)
+        if message:
+            rects.append(message)
+            dirty.append(message)
+        self.drawn = rects
+        return dirty
+
+    def update(self, dx=None):
+        """ Advances the level by one step. Fast balls are moved in a few
+            substeps, each followed by collision detection, so that they
+            can't pass through tiles or the paddle (see SUBSTEP). The paddle
+            moves before them, or along with them (see paddle_substeps).
+
+            Parameters
+                dx: int - paddle movement (read from the mouse if None) """
+        self.blasted.clear()
+        self.remember_positions()
+        if dx is None:
+            dx, _ = pygame.mouse.get_rel()
+
+        if self.finished or self.paused:
+            self.move_paddle(dx)
+        else:
+            substeps = self.substeps(dx)
+            moves = [dx] + [0] * (substeps - 1)
+            if self.paddle_substeps:
+                moves = [dx * (k + 1) // substeps - dx * k // substeps for k in range(substeps)]
+
+            self.move_paddle(moves[0])
+            with timing.phase("update.bonuses"):
+                self.bonuses.update()
+            for k in range(substeps):
+                if k:
+                    self.move_paddle(moves[k])
+                with timing.phase("update.balls"):
+                    self.balls.update(substeps)
+                if not self.balls:
+                    events.post(events.Death())
+                    break
+                if not self.tiles.remaining():
+                    self.finished = True
+                    self.sounds["next_level"].play()
+                    break
+                with timing.phase("update.collisions"):
+                    self.detect_collisions()
+        with timing.phase("update.explosions"):
+            self.explosions.update()
+
+    def move_paddle(self, dx):
+        x0 = self.paddle.rect.centerx
+        self.paddle.update(dx=dx, paused=self.finished or self.paused)
+        if self.ball_engine == "array":
+            self.balls.drag(self.paddle.rect.centerx - x0)
+
+    def remember_positions(self):
+        """ Stores the positions of the moving sprites before an update,
+            to draw them in between (see sprite_blits). """
+        for bonus in self.bonuses:
+            bonus.previous = bonus.rect.topleft
+        if self.ball_engine == "array":
+            self.balls.remember_positions()
+        else:
+            for ball in self.balls:
+                ball.previous = ball.rect.topleft
+
+    def substeps(self, dx=0):
+        """ Returns the number of substeps needed for the fastest ball, or
+            for the paddle moving by dx (see paddle_substeps). """
+        if self.ball_engine == "array":
+            speed = self.balls.max_speed()
+        else:
+            speed = max((max(abs(ball.vx), abs(ball.vy)) for ball in self.balls
+                         if not ball.is_attached), default=0)
+        if self.paddle_substeps:
+            speed = max(speed, abs(dx))
+        return max(1, math.ceil(speed / self.SUBSTEP))
 
     def detect_collisions(self):
         """ Detects sprite collisions. """
         # paddle vs. balls
-        for ball in pygame.sprite.spritecollide(self.paddle, self.balls, False):
-            ball.on_hit(self.paddle)
+        if self.ball_engine == "array":
+            self.balls.collide_paddle(self.paddle)
+        else:
+            for ball in pygame.sprite.spritecollide(self.paddle, self.balls, False):
+                ball.on_hit(self.paddle)
 
         # paddle vs. bonuses
         for bonus in pygame.sprite.spritecollide(self.paddle, self.bonuses, True):
             bonus.on_collect()
 
         # balls vs. tiles
-        for ball in self.balls:
-            for tile in pygame.sprite.spritecollide(ball, self.tiles, False):
-                ball.hit(tile)
-                break
+        if self.ball_engine == "array":
+            self.balls.collide_tiles(self.tiles)
+        elif self.broadphase == "grid" or self.tile_engine == "grid":
+            for ball in self.balls:
+                tiles = self.tiles.collide(ball.rect)
+                if tiles:
+                    ball.hit(tiles[0])
+        else:
+            for ball in self.balls:
+                for tile in pygame.sprite.spritecollide(ball, self.tiles, False):
+                    ball.hit(tile)
+                    break
 
     def explosion(self, x, y):
-        """ Trigerred when an explosion occurs. Destoys all tiles around
-            the explosion center. """
-        i, j = (x - MARGIN) // 60, (y - 3 * MARGIN) // 30
-        for k in range(-1, 2):
-            for l in range(-1, 2):
-                try:
-                    tile = self.tile_matrix[i + k][j + l]
-                    x, y = MARGIN + 60 * (i + k) + 30, 3 * MARGIN + 30 * (j + l) + 15
-                    if MARGIN < x <= SCREEN_WIDTH - MARGIN:
-                        mute = not (k == 0 and l == 0)
-                        self.explosions.add(Explosion(x, y, mute=mute))
-                        if tile.alive():
-                            tile.kill()
-                except (AttributeError, IndexError):
-                    pass
+        """ Triggered when an explosion occurs. Destroys all tiles around
+            the explosion center. Explosive tiles caught in the blast go off
+            as well, so the whole chain reaction is resolved here in a single
+            breadth-first pass over the grid: every cell gets at most one
+            explosion sprite per frame (see blasted) and the points are
+            posted as one event. """
+        start = (x - MARGIN) // WIDTH, (y - 3 * MARGIN) // HEIGHT
+        columns, rows = self.tiles.columns, self.tiles.rows
+        queue = collections.deque([start])
+        points = 0
+        while queue:
+            i, j = queue.popleft()
+            for k in range(max(i - 1, 0), min(i + 2, columns)):
+                for l in range(max(j - 1, 0), min(j + 2, rows)):
+                    if (k, l) in self.blasted:
+                        continue
+                    self.blasted.add((k, l))
+                    x, y = MARGIN + WIDTH * k + WIDTH // 2, 3 * MARGIN + HEIGHT * l + HEIGHT // 2
+                    self.explosions.add(Explosion.get(x, y, mute=(k, l) != start))
+
+                    tile = self.tiles.tile(k, l)
+                    if tile is not None:
+                        if tile.explosive:
+                            # the chained explosion is handled by this loop
+                            # instead of the tile posting an event
+                            points += tile.points
+                            queue.append((k, l))
+                        Tile.kill(tile)
+        if points:
+            events.post(events.Points(points))
 
     def on_death(self):
         """ Triggered when player loses all balls. """
         if self.n != 0:
             self.sounds["death"].play()
-            time.sleep(1)
 
         Ball.reset_state()
 
         # refresh paddle, ball, delete bonuses
-        self.bonuses.empty()
-        self.paddle = Paddle()
-        self.balls.empty()
-        ball = Ball()
-        self.balls.add(ball)
-        self.paddle.attached_balls.add(ball)
+        for bonus in self.bonuses:
+            bonus.kill() # back to the pool
+        self.paddle.reset()
+        self.reset_balls()
+
+    def reset_balls(self):
+        """ Leaves a single ball in play, attached to the paddle. """
+        if self.ball_engine == "array":
+            from ball_array import BallArray # pylint: disable=import-outside-toplevel
+            self.balls = BallArray(Ball()) # only copied, see BallArray.add
+        else:
+            if self.balls is None:
+                self.balls = pygame.sprite.Group()
+            for ball in self.balls:
+                ball.kill() # back to the pool
+            ball = Ball.get()
+            self.balls.add(ball)
+            self.paddle.attached_balls.clear()
+            self.paddle.attached_balls.add(ball)
+
+    def release_balls(self):
+        """ Releases the balls attached to the paddle. """
+        if self.ball_engine == "array":
+            self.balls.release(self.paddle)
+        else:
+            for ball in self.paddle.attached_balls:
+                ball.on_hit(self.paddle)
+            self.paddle.attached_balls.clear()
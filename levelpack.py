@@ -0,0 +1,167 @@
+# pylint: disable=invalid-name
+""" Module handling level packs: single binary files holding any number of
+    levels, indexed by level number. The file is memory-mapped, so opening
+    a pack only reads its index and each level is decoded when requested.
+
+    Layout of a pack (all integers little-endian):
+        header: magic b"BZLP", format version (u16), number of levels (u32)
+        index: one (level number (u32), record offset (u32)) pair per level
+        records: one per level - max score (u32), tile count of each type
+            (u16 each, in the order of TYPES), then the grid: one type code
+            byte per cell, column by column (cell (i, j) at i * ROWS + j),
+            0 meaning an empty cell
+
+    Packs are built from text layouts, where each line has the form
+    "row column alias" (e.g. "11 2 r") and blank lines are ignored:
+
+        python levelpack.py levels/levels.pack levels/1.txt levels/2.txt ...
+
+    This module doesn't depend on pygame, so packs can be built and
+    validated without it. """
+
+import collections
+import mmap
+import os
+import re
+import struct
+import sys
+
+MAGIC = b"BZLP"
+VERSION = 1
+COLUMNS, ROWS = 16, 16 # size of the grid
+
+TYPES = "rgbue" # tile aliases, the code of a type is its position + 1
+MAX_POINTS = {"r": 5, "g": 10, "b": 5, "u": 20, "e": 15} # points for destroying a tile
+
+HEADER = struct.Struct("<4sHI")
+INDEX = struct.Struct("<II")
+RECORD = struct.Struct(f"<I{len(TYPES)}H{COLUMNS * ROWS}s")
+
+Record = collections.namedtuple("Record", ["max_score", "counts", "grid"])
+
+
+class LevelPackError(ValueError):
+    """ Raised when a pack or a text layout is malformed. """
+
+
+class LevelPack:
+    """ Class representing an open level pack. Levels are looked up by their
+        numbers with pack[n] which returns a Record; counts maps tile aliases
+        to the number of tiles of that type and grid is a list of columns of
+        aliases (or None for empty cells), indexed in the same way as
+        Level.tile_matrix. """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER.size:
+            raise LevelPackError(f"{path}: truncated header")
+        magic, version, count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise LevelPackError(f"{path}: not a level pack")
+        if version != VERSION:
+            raise LevelPackError(f"{path}: unsupported version {version}")
+        end = HEADER.size + count * INDEX.size
+        if len(self.data) < end:
+            raise LevelPackError(f"{path}: truncated index")
+
+        self.offsets = dict(INDEX.iter_unpack(self.data[HEADER.size:end]))
+        for n, offset in self.offsets.items():
+            if not end <= offset <= len(self.data) - RECORD.size:
+                raise LevelPackError(f"{path}: level {n} out of bounds")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, n):
+        return n in self.offsets
+
+    def __iter__(self):
+        return iter(sorted(self.offsets))
+
+    def __getitem__(self, n):
+        max_score, *counts, codes = RECORD.unpack_from(self.data, self.offsets[n])
+        if max(codes) > len(TYPES):
+            raise LevelPackError(f"{self.path}: invalid tile type in level {n}")
+        aliases = [None, *TYPES]
+        grid = [[aliases[code] for code in codes[i * ROWS:(i + 1) * ROWS]]
+                for i in range(COLUMNS)]
+        return Record(max_score, dict(zip(TYPES, counts)), grid)
+
+    def close(self):
+        """ Unmaps the pack; the records must not be read any more. """
+        self.data.close()
+
+
+packs = {} # the mapping between paths and open packs
+
+
+def get(path):
+    """ Returns the pack stored at path, opening it on first use. """
+    pack = packs.get(path)
+    if pack is None:
+        pack = packs[path] = LevelPack(path)
+    return pack
+
+
+def parse(text):
+    """ Parses a text layout and returns the grid (see LevelPack). """
+    grid = [[None] * ROWS for _ in range(COLUMNS)]
+    for k, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        match = re.fullmatch(r"\s*(\d+)\s+(\d+)\s+(\S+)\s*", line)
+        if match is None:
+            raise LevelPackError(f"line {k}: expected 'row column alias'")
+        j, i, alias = int(match[1]), int(match[2]), match[3]
+        if alias not in TYPES:
+            raise LevelPackError(f"line {k}: invalid tile type: {alias}")
+        if i >= COLUMNS or j >= ROWS:
+            raise LevelPackError(f"line {k}: cell out of the grid")
+        grid[i][j] = alias
+    return grid
+
+
+def encode(grid):
+    """ Returns the record of a level given its grid. """
+    codes = bytes(0 if alias is None else TYPES.index(alias) + 1
+                  for column in grid for alias in column)
+    aliases = [alias for column in grid for alias in column if alias is not None]
+    counts = [aliases.count(alias) for alias in TYPES]
+    max_score = sum(MAX_POINTS[alias] for alias in aliases)
+    return RECORD.pack(max_score, *counts, codes)
+
+
+def write(path, grids):
+    """ Writes a pack with the given levels.
+
+        Parameters
+            path: str - where to write the pack
+            grids: dict - the mapping between level numbers and grids """
+    start = HEADER.size + len(grids) * INDEX.size
+    with open(path + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(grids)))
+        for k, n in enumerate(sorted(grids)):
+            file.write(INDEX.pack(n, start + k * RECORD.size))
+        for n in sorted(grids):
+            file.write(encode(grids[n]))
+    os.replace(path + ".tmp", path)
+
+
+def main(path, *sources):
+    """ Builds a pack from text layouts named after their level numbers. """
+    grids = {}
+    for source in sources:
+        n = int(os.path.splitext(os.path.basename(source))[0])
+        with open(source, encoding="utf-8") as file:
+            try:
+                grids[n] = parse(file.read())
+            except LevelPackError as error:
+                raise LevelPackError(f"{source}: {error}") from None
+    write(path, grids)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -4,14 +4,41 @@
 MARGIN = 32
 SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768
 
-FPS = 60
+FPS = 60 # simulation steps per second
+MAX_FPS = 240 # frames of a running game drawn per second at most, between the steps
+MAX_STEPS = 5 # steps caught up at most after a stall, the rest is dropped
+DIRTY_RECTS = True # repaint only the changed parts of the screen when possible
+WAIT_SLICE = 5 # ms slept at a time while waiting for input on pygame 1 (see wait)
 
 if __name__ == "__main__":
+    import argparse
+    import atexit
+
     import pygame
 
+    import audio
+    import inputs
+    import timers
+    import timing
     from game import Game
 
+    parser = argparse.ArgumentParser(description="Ball-Z")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save a recording of each game (see replay.py)")
+    parser.add_argument("--overlay", action="store_true",
+                        help="show the frame timings (toggled with F3)")
+    parser.add_argument("--trace", metavar="FILE", help="write the frame timings as CSV on exit")
+    args = parser.parse_args()
+
+    # only the recent frames are kept for the overlay, unless they are traced
+    timer = timing.start(trace=timing.FrameTimer.TRACE if args.trace else 0)
+    timer.overlay = args.overlay
+    if args.trace:
+        atexit.register(timer.dump, args.trace)
+
+    pygame.mixer.pre_init(buffer=128)
     pygame.init()
+    audio.mixer.setup()
 
     surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
     pygame.display.set_caption("Ball-Z")
@@ -21,13 +48,79 @@ if __name__ == "__main__":
 
     clock = pygame.time.Clock()
 
-    game = Game()
+    game = Game(record=args.record)
+    f3 = False
+
+    def wait(ms):
+        """ Sleeps until there is an event, the next timer is due (see
+            timers.scheduler) or for ms, leaving the events in the queue. """
+        due = timers.scheduler.until_next()
+        if due is not None:
+            ms = min(ms, due)
+        if ms <= 0:
+            return
+        if pygame.version.vernum < (2,):
+            # pygame.event.wait has no timeout, so the queue is checked
+            # between short sleeps instead
+            end = pygame.time.get_ticks() + ms
+            while not pygame.event.peek():
+                left = end - pygame.time.get_ticks()
+                if left <= 0:
+                    return
+                pygame.time.wait(min(WAIT_SLICE, left))
+            return
+        event = pygame.event.wait(ms)
+        if event.type != pygame.NOEVENT:
+            for queued in [event] + pygame.event.get():
+                pygame.event.post(queued)
+
+    # the simulation runs in fixed steps, as many per frame as the elapsed
+    # time requires; frames are drawn in between, interpolating the sprites
+    step = 1000 / FPS
+    lag = step
 
     while True:
-        game.eventloop()
+        # static screens wait for input instead of being redrawn every frame
+        timeout = game.idle()
+        if timeout:
+            with timing.phase("idle"):
+                wait(timeout)
+
+        with timing.phase("tick"):
+            dt = clock.tick(game.max_fps())
+        timers.scheduler.advance(dt)
+        lag += dt
+        if lag > MAX_STEPS * step:
+            lag = step
+
+        while lag >= step:
+            with timing.phase("eventloop"):
+                game.eventloop()
+            with timing.phase("update"):
+                game.update()
+            lag -= step
+
+        # overlay
+        if pygame.key.get_pressed()[pygame.K_F3] and not f3:
+            timer.overlay = not timer.overlay
+            game.invalidate()
+        f3 = pygame.key.get_pressed()[pygame.K_F3]
 
-        game.draw(surface)
-        game.update()
+        # the paddle is drawn where the latest mouse movements put it; the
+        # other screens don't use them, so they aren't kept there
+        if isinstance(game.state, Game.RunningGame):
+            inputs.mouse.poll()
+        with timing.phase("draw"):
+            rects = game.draw(surface, lag / step)
+            if timer.overlay:
+                rect = timer.draw(surface)
+                if rects is not None:
+                    rects.append(rect)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        with timing.phase("flip"):
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+        inputs.mouse.flipped()
+        timing.end_frame()
@@ -1,21 +1,24 @@
 # pylint: disable=missing-function-docstring,invalid-name
 """ Module containing the Paddle class. """
 
-import os
 
 import pygame
 
+from assets import Images
 from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
 
 
 class Paddle(pygame.sprite.Sprite):
     """ Class representing the paddle. """
-    images = {"base": pygame.image.load(os.path.join("images", "paddle.png")),
-              "magnetic": pygame.image.load(os.path.join("images", "magnetic_paddle.png"))}
+    images = Images({"base": ("paddle.png",), "magnetic": ("magnetic_paddle.png",)})
+    scaled = {} # variant -> (original image, {length: scaled image})
 
     def __init__(self):
         pygame.sprite.Sprite.__init__(self)
+        self.reset()
 
+    def reset(self):
+        """ Brings the paddle back to its initial state (see Level.on_death). """
         self.len = 0 # between -2 and 2
         self.image = self.images["base"]
         self.rect = self.image.get_rect(
@@ -41,22 +44,18 @@ class Paddle(pygame.sprite.Sprite):
         if paused:
             return
 
-        if self.is_confused:
-            dx *= -1
-        left, right = self.rect.left, self.rect.right
+        dx = self.reach(dx)
         self.rect.move_ip(dx, 0)
-
-        # stop at boundary
-        if self.rect.left <= MARGIN:
-            self.rect.left = MARGIN
-            dx = MARGIN - left
-        elif self.rect.right >= SCREEN_WIDTH - MARGIN:
-            self.rect.right = SCREEN_WIDTH - MARGIN
-            dx = SCREEN_WIDTH - MARGIN - right
-
         for ball in self.attached_balls:
             ball.rect.move_ip(dx, 0)
 
+    def reach(self, dx):
+        """ Returns how far the paddle moves for a mouse movement dx: the
+            other way if it is confused, and not beyond the margins. """
+        if self.is_confused:
+            dx *= -1
+        return max(MARGIN - self.rect.left, min(SCREEN_WIDTH - MARGIN - self.rect.right, dx))
+
     def draw(self, surface):
         surface.blit(self.image, self.rect)
 
@@ -65,9 +64,21 @@ class Paddle(pygame.sprite.Sprite):
             Parameters
                 - length: int from -2 to 2  """
         self.len = length
-        w, h = self.images["base"].get_size()
-        self.image = pygame.transform.scale(
-            self.image, (int(w * 2 ** self.len), h)
-        )
+        variant = "magnetic" if self.is_magnetic else "base"
+        self.image = self.scaled_image(variant, self.len)
         self.rect = self.image.get_rect(center=self.rect.center)
+
+    @classmethod
+    def scaled_image(cls, variant, length):
+        """ Returns the image of the given variant ("base" or "magnetic")
+            scaled to the given length. All lengths of a variant are scaled
+            once, always from the original image. """
+        image = cls.images[variant]
+        if variant not in cls.scaled or cls.scaled[variant][0] is not image:
+            w, h = image.get_size()
+            cls.scaled[variant] = (image, {
+                n: image if n == 0 else pygame.transform.scale(image, (int(w * 2 ** n), h))
+                for n in range(-2, 3)
+            })
+        return cls.scaled[variant][1][length]
         
\ No newline at end of file
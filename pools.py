@@ -0,0 +1,71 @@
+# pylint: disable=missing-function-docstring
+""" Module keeping the killed sprites which are short-lived and numerous
+    (balls, bonuses, explosions) for reuse, so that a chain of explosions
+    or a split of many balls doesn't allocate new objects. Sprites and
+    their groups reference each other, so every discarded sprite is left
+    to the cyclic garbage collector. """
+
+import abc
+import collections
+
+
+class Pool:
+    """ Class keeping up to size killed sprites of each class. The counters
+        show how many sprites have been created and how many reused.
+
+        Parameters
+            size: int - max number of kept sprites per class """
+
+    def __init__(self, size=64):
+        self.size = size
+        self.free = collections.defaultdict(list) # class -> killed sprites
+        self.allocated = 0 # sprites created because none could be reused
+        self.reused = 0
+        self.discarded = 0 # killed sprites not kept because the pool was full
+
+    def get(self, cls, *args, **kwargs):
+        """ Returns a sprite of class cls, a kept one reset with the
+            arguments if possible (see Pooled.reset). """
+        free = self.free[cls]
+        if free:
+            self.reused += 1
+            sprite = free.pop()
+            sprite.reset(*args, **kwargs)
+            return sprite
+        self.allocated += 1
+        return cls(*args, **kwargs)
+
+    def release(self, sprite):
+        free = self.free[type(sprite)]
+        if len(free) < self.size:
+            free.append(sprite)
+        else:
+            self.discarded += 1
+
+    def clear(self):
+        self.free.clear()
+
+    def stats(self):
+        return {"allocated": self.allocated, "reused": self.reused, "discarded": self.discarded}
+
+
+class Pooled(abc.ABC):
+    """ Mixin for sprites taken from a Pool (see get). A sprite goes back
+        to the pool when it is killed while in a group, so it mustn't be
+        used after it has been killed. """
+    pool = None # Pool, defined in subclasses
+
+    @classmethod
+    def get(cls, *args, **kwargs):
+        return cls.pool.get(cls, *args, **kwargs)
+
+    @abc.abstractmethod
+    def reset(self, *args, **kwargs):
+        """ Brings a kept sprite to the state of a new one, takes the
+            arguments of __init__. """
+
+    def kill(self):
+        # alive and kill come from pygame.sprite.Sprite, next in the MRO
+        if self.alive(): # pylint: disable=no-member
+            super().kill() # pylint: disable=no-member
+            self.pool.release(self)
@@ -0,0 +1,166 @@
+# pylint: disable=invalid-name,no-member
+""" Module for recording and replaying games. A recording holds the seed of
+    the random number generator and the input of every frame (paddle
+    movement, clicks and pause toggles), which is all a game depends on, so
+    replaying it reproduces the game exactly.
+
+    Layout of a recording file (all integers little-endian):
+        header: magic b"BZRC", format version (u16), seed (u32),
+            start level (u16), number of frames (u32)
+        frames: paddle movement (i16), clicks (u8), flags (u8, bit 0 set
+            if the pause has been toggled)
+
+    Games are recorded with `python main.py --record FILE` and replayed with
+
+        python replay.py FILE            # headless, as fast as possible
+        python replay.py --visual FILE   # on the screen, at normal speed """
+
+import argparse
+import collections
+import random
+import struct
+import time
+
+import pygame
+
+import timers
+
+MAGIC = b"BZRC"
+VERSION = 2 # 2: balls move in substeps (see Level.update)
+
+HEADER = struct.Struct("<4sHIHI")
+FRAME = struct.Struct("<hBB")
+PAUSE = 1 # flag set in the frames in which the pause has been toggled
+
+Frame = collections.namedtuple("Frame", ["dx", "clicks", "pause"])
+
+
+class Recording:
+    """ Class representing a recorded game.
+
+        Parameters
+            start_lvl: int - the level the game starts from
+            seed: int - the seed of the random number generator (random
+                if None) """
+
+    def __init__(self, start_lvl=1, seed=None):
+        self.start_lvl = start_lvl
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.frames = []
+
+    def start(self):
+        """ Seeds the random number generator, must be called right before
+            the game is created. """
+        random.seed(self.seed)
+
+    def record(self, dx, clicks=0, pause=False):
+        """ Appends the input of a frame. """
+        self.frames.append(Frame(dx, clicks, pause))
+
+    def save(self, path):
+        """ Writes the recording to the file at path. """
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.start_lvl, len(self.frames)))
+            file.write(b"".join(FRAME.pack(dx, clicks, PAUSE if pause else 0)
+                                for dx, clicks, pause in self.frames))
+
+    @classmethod
+    def load(cls, path):
+        """ Reads the recording stored in the file at path, raising a
+            ValueError if it isn't a valid one. """
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, seed, start_lvl, n = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a recording")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported version {version}")
+        if len(data) != HEADER.size + n * FRAME.size:
+            raise ValueError(f"{path}: expected {n} frames")
+
+        recording = cls(start_lvl, seed)
+        recording.frames = [Frame(dx, clicks, bool(flags & PAUSE))
+                            for dx, clicks, flags in FRAME.iter_unpack(data[HEADER.size:])]
+        return recording
+
+    def play(self):
+        """ Replays the game without a display, as fast as possible, and
+            returns the final Simulation. """
+        from simulation import Simulation # pylint: disable=import-outside-toplevel
+
+        self.start()
+        sim = Simulation(self.start_lvl)
+        for frame in self.frames:
+            sim.step(*frame)
+        sim.step() # handle the events of the last frame
+        return sim
+
+    def show(self, surface, fps):
+        """ Replays the game on surface at the given frame rate. Returns the
+            final game or None if the replay has been interrupted. """
+        from game import Game # pylint: disable=import-outside-toplevel
+
+        self.start()
+        game = Game.RunningGame(self.start_lvl)
+        clock = pygame.time.Clock()
+        for frame in self.frames:
+            # the game stands still for a while after a death (see
+            # RunningGame.frozen), these frames aren't recorded
+            while True:
+                for event in pygame.event.get():
+                    if (event.type == pygame.QUIT
+                            or event.type == pygame.KEYUP and event.key == pygame.K_ESCAPE):
+                        return None
+
+                frozen = game.frozen
+                if not frozen:
+                    game.step(*frame)
+                rects = game.draw(surface)
+                if rects is None:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
+                timers.scheduler.advance(clock.tick(fps))
+                if not frozen:
+                    break
+        return game
+
+
+def main():
+    """ Replays a recording given on the command line. """
+    parser = argparse.ArgumentParser(description="Replays a recorded game.")
+    parser.add_argument("path", help="the recording")
+    parser.add_argument("--visual", action="store_true", help="show the game at normal speed")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.path)
+    if args.visual:
+        import audio # pylint: disable=import-outside-toplevel
+        from main import SCREEN_WIDTH, SCREEN_HEIGHT, FPS # pylint: disable=import-outside-toplevel
+
+        pygame.init()
+        audio.mixer.setup()
+        surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Ball-Z (replay)")
+        game = recording.show(surface, FPS)
+        pygame.quit()
+        if game is None:
+            return
+    else:
+        import assets # pylint: disable=import-outside-toplevel
+        assets.headless = True
+
+        start = time.perf_counter()
+        game = recording.play()
+        elapsed = time.perf_counter() - start
+        print(f"{len(recording.frames)} frames in {elapsed:.2f} s "
+              f"({len(recording.frames) / max(elapsed, 1e-9):.0f} FPS)")
+
+    print(f"level: {game.n_lvl}, lives: {game.lives}, score: {game.final_score}, "
+          f"over: {game.over}, won: {game.won}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# pylint: disable=invalid-name
+""" Module containing the ScoreStore class, the persistent high-score table. """
+
+import contextlib
+import datetime
+import os
+import pickle
+import sqlite3
+
+
+class ScoreStore:
+    """ Class representing the high scores of all players, kept in an SQLite
+        database. Every score is a separate row added in its own transaction,
+        so several game instances sharing the same file never overwrite each
+        other's scores. Scores are kept per level pack and day; the best ones
+        are read through an index, without loading the whole table.
+
+        Parameters
+            path: str - the database file (created on first use)
+            timeout: float - how long to wait (in seconds) for another
+                instance holding a lock on the database
+            legacy: str - the pickled ranking of former versions, a list
+                of (name, score) pairs, imported when the database is
+                created (the file is left as it is) """
+
+    # separate statements, as executescript would commit the transaction
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            pack TEXT NOT NULL,
+            day TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS scores_by_pack ON scores (pack, score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS scores_by_day ON scores (pack, day, score DESC, id)",
+    )
+
+    LEGACY_PACK = "levels.pack" # the levels the legacy ranking has been played on
+
+    def __init__(self, path, timeout=10.0, legacy=None):
+        self.path = path
+        self.timeout = timeout
+        self.legacy = legacy
+        self.created = False
+
+    @contextlib.contextmanager
+    def connect(self):
+        """ Opens a connection for the duration of a single transaction. The
+            first one creates the table and imports the legacy ranking if
+            needed; it takes the write lock right away (BEGIN IMMEDIATE), so
+            that instances opening a new database at the same moment can't
+            both find it empty and import the ranking twice. """
+        db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        with contextlib.closing(db):
+            db.execute("BEGIN" if self.created else "BEGIN IMMEDIATE")
+            try:
+                if not self.created:
+                    self.create(db)
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            self.created = True
+
+    def create(self, db):
+        """ Creates the table and its indexes, importing the legacy ranking
+            into a new table. """
+        exists = db.execute("SELECT 1 FROM sqlite_master "
+                            "WHERE type = 'table' AND name = 'scores'").fetchone()
+        for statement in self.SCHEMA:
+            db.execute(statement)
+        if not exists:
+            self.import_legacy(db)
+
+    def import_legacy(self, db):
+        """ Copies the legacy ranking into the new table. Its scores are
+            dated by the last change of the file. """
+        if self.legacy is None:
+            return
+        try:
+            with open(self.legacy, "rb") as f:
+                ranking = pickle.load(f)
+            day = datetime.date.fromtimestamp(os.path.getmtime(self.legacy)).isoformat()
+        except (FileNotFoundError, EOFError):
+            return
+        db.executemany("INSERT INTO scores (name, score, pack, day) VALUES (?, ?, ?, ?)",
+                       [(name, score, self.LEGACY_PACK, day) for name, score in ranking])
+
+    def add(self, name, score, pack, day=None):
+        """ Records a score. The day defaults to today (an ISO date). """
+        day = day or datetime.date.today().isoformat()
+        with self.connect() as db:
+            db.execute("INSERT INTO scores (name, score, pack, day) VALUES (?, ?, ?, ?)",
+                       (name, score, pack, day))
+
+    def top(self, pack, k=5, day=None):
+        """ Returns the k best (name, score) pairs of a level pack, of all
+            time or of a single day. Equal scores are ordered by age. """
+        with self.connect() as db:
+            if day is None:
+                rows = db.execute("SELECT name, score FROM scores WHERE pack = ? "
+                                  "ORDER BY score DESC, id LIMIT ?", (pack, k))
+            else:
+                rows = db.execute("SELECT name, score FROM scores WHERE pack = ? AND day = ? "
+                                  "ORDER BY score DESC, id LIMIT ?", (pack, day, k))
+            return rows.fetchall()
@@ -0,0 +1,118 @@
+# pylint: disable=invalid-name,missing-function-docstring
+""" Module defining the Simulation class, i.e. the game without a display. """
+
+import concurrent.futures
+
+import events
+from level import Level
+
+
+class Simulation: # pylint: disable=too-many-instance-attributes
+    """ Class representing the state of a running game: the current level,
+        lives and score. It doesn't depend on the display, the mixer or fonts,
+        so it can be stepped as fast as possible, e.g. in tests or batch runs.
+        Rendering and input handling are added on top by Game.RunningGame. """
+
+    # read the layout of the next level in a worker thread while the
+    # cleared one is still shown; the sprites are created when the level
+    # is handed over, in the main thread, as they share class-wide state
+    # (Ball, pools, assets) with the level being played
+    prefetch = True
+    executor = None # shared by all games, created on first use
+
+    def __init__(self, start_lvl=1):
+        self.n_lvl = start_lvl # the current level number
+        self.lvl = Level(self.n_lvl) # the current level object
+        self.lives = 2 # lives left
+        self.score = 0 # points
+        self.deaths = 0 # lives lost, by losing all balls or by the Death bonus
+
+        self.over = False # set when the game ends
+        self.won = False
+        self.prefetched = None # (number, future record) of the level being prefetched
+
+        # gameplay events
+        self.bus = events.Bus()
+        self.bus.subscribe(events.BonusDropped, lambda event: self.lvl.bonuses.add(event.bonus))
+        self.bus.subscribe(events.BonusCollected, lambda event: event.bonus.take_effect(self))
+        self.bus.subscribe(events.Points, self.add_points)
+        self.bus.subscribe(events.Explosion, lambda event: self.lvl.explosion(*event.where))
+        self.bus.subscribe(events.Death, lambda event: self.on_death())
+        self.bus.subscribe(events.GameOver, self.end)
+        self.activate()
+
+    def activate(self):
+        """ Makes the gameplay events go to the bus of this game. """
+        events.bus = self.bus
+
+    @property
+    def final_score(self):
+        """ Score including the bonus for cleared levels. """
+        return self.score + (self.n_lvl - 1) * 1000
+
+    def on_death(self):
+        """ Triggered when player loses all balls. """
+        self.lvl.on_death()
+        self.deaths += 1
+        self.lives -= 1
+        if self.lives < 0:
+            events.post(events.GameOver(won=False))
+
+    def prefetch_level(self):
+        """ Starts reading the next level in the background. """
+        if self.prefetched is None:
+            if Simulation.executor is None:
+                Simulation.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="prefetch")
+            self.prefetched = self.n_lvl + 1, self.executor.submit(Level.read, self.n_lvl + 1)
+
+    def next_level(self):
+        """ Triggered when player finishes the current level. """
+        self.n_lvl += 1
+        prefetched, self.prefetched = self.prefetched, None
+        try:
+            record = None
+            if prefetched is not None and prefetched[0] == self.n_lvl:
+                record = prefetched[1].result()
+            self.lvl = Level(self.n_lvl, record)
+        except KeyError:
+            events.post(events.GameOver(won=True))
+
+    def toggle_pause(self):
+        """ Triggered when player presses P. """
+        if not self.lvl.finished:
+            self.lvl.paused = not self.lvl.paused
+
+    def click(self):
+        """ Triggered when player clicks: either moves on to the next level
+            or releases the balls attached to the paddle. """
+        if self.lvl.finished:
+            self.next_level()
+        else:
+            self.lvl.release_balls()
+
+    def add_points(self, event):
+        self.score += event.points
+
+    def end(self, event):
+        """ Triggered when the game is over. """
+        self.over = True
+        self.won = event.won
+
+    def step(self, dx=0, click=0, pause=False):
+        """ Advances the game by one frame.
+
+            Parameters
+                dx: int - paddle movement
+                click: int - number of clicks during the frame
+                pause: bool - whether player toggled the pause """
+        self.activate()
+        if pause:
+            self.toggle_pause()
+        for _ in range(click):
+            self.click()
+        self.bus.dispatch()
+        if not self.over:
+            self.lvl.update(dx=dx)
+            if self.lvl.finished and self.prefetch:
+                self.prefetch_level()
@@ -0,0 +1,46 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+import assets
+
+
+class AssetsTestCase(unittest.TestCase):
+    def tearDown(self):
+        assets.headless = False
+        assets.images.clear()
+        assets.converted.clear()
+
+    def test_load(self):
+        image = assets.load("ball.png")
+        self.assertIs(assets.load("ball.png"), image)
+        self.assertEqual(image.get_size(), assets.size("ball.png"))
+
+    def test_headless(self):
+        assets.headless = True
+        image = assets.load("paddle.png")
+        self.assertEqual(image.get_size(), (144, 21))
+
+    def test_convert(self):
+        image = pygame.Surface((10, 10), pygame.SRCALPHA) # pylint: disable=too-many-function-args
+        image.fill((255, 255, 255, 255))
+        pygame.display.init()
+        pygame.display.set_mode((10, 10))
+        self.assertFalse(assets.convert(image).get_flags() & pygame.SRCALPHA)
+        image.set_at((0, 0), (0, 0, 0, 0))
+        self.assertTrue(assets.convert(image).get_flags() & pygame.SRCALPHA)
+
+    def test_descriptors(self):
+        class Sprite: # pylint: disable=too-few-public-methods
+            image = assets.Image("tiles", "regular.png")
+            images = assets.Images({"base": ("tiles", "glass.png")})
+            frames = assets.Images([("explosion", "1.png"), ("explosion", "2.png")])
+
+        self.assertIs(Sprite.image, assets.load("tiles/regular.png"))
+        self.assertIs(Sprite().images["base"], assets.load("tiles/glass.png"))
+        self.assertEqual(len(Sprite.frames), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
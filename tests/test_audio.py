@@ -0,0 +1,112 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+from audio import Sound, Mixer, Music
+from timers import scheduler
+
+
+pygame.init()
+
+
+class MixerTestCase(unittest.TestCase):
+    def setUp(self):
+        if not pygame.mixer.get_init():
+            self.skipTest("no audio device")
+        self.mixer = Mixer()
+        self.mixer.CHANNELS, self.mixer.RESERVED = 4, 1
+        self.mixer.setup()
+        self.mixer.WINDOW = 0
+
+    def tearDown(self):
+        pygame.mixer.stop()
+        pygame.mixer.set_reserved(0)
+        pygame.mixer.set_num_channels(0)
+
+    def test_window(self):
+        sound = Sound("sounds", "wall_hit.wav")
+        self.mixer.WINDOW = 1000
+        self.assertIsNotNone(self.mixer.play(sound))
+        self.assertIsNone(self.mixer.play(sound))
+        self.assertEqual(self.mixer.dropped, 1)
+
+    def test_voices(self):
+        sound = Sound("sounds", "wall_hit.wav", voices=2)
+        self.assertIsNotNone(self.mixer.play(sound))
+        self.assertIsNotNone(self.mixer.play(sound))
+        self.assertIsNone(self.mixer.play(sound))
+
+    def test_priority(self):
+        low = Sound("sounds", "wall_hit.wav")
+        high = Sound("sounds", "positive.wav", priority=1)
+        for _ in range(3):
+            self.assertIsNotNone(self.mixer.play(low))
+        self.assertIsNone(self.mixer.play(low))
+
+        channel = self.mixer.play(high)
+        self.assertIsNotNone(channel)
+        self.assertIs(channel.get_sound(), high.sound)
+        self.assertEqual(low.sound.get_num_channels(), 2)
+        channel = self.mixer.find_channel(Sound("sounds", "negative.wav", priority=1))
+        self.assertIs(channel.get_sound(), low.sound)
+
+    def test_reserved(self):
+        low = Sound("sounds", "wall_hit.wav", priority=5)
+        death = Sound("sounds", "death.wav", reserved=True)
+        for _ in range(3):
+            self.mixer.play(low)
+        self.mixer.play(death)
+        self.assertIs(pygame.mixer.Channel(0).get_sound(), death.sound)
+        self.assertEqual(low.sound.get_num_channels(), 3)
+
+    def test_no_mixer(self):
+        pygame.mixer.set_num_channels(0)
+        self.assertIsNone(self.mixer.play(Sound("sounds", "wall_hit.wav", reserved=True)))
+
+
+class MusicTestCase(unittest.TestCase):
+    def setUp(self):
+        if not pygame.mixer.get_init():
+            self.skipTest("no audio device")
+        self.music = Music("sounds", "menu.wav", volume=0.5)
+
+    def tearDown(self):
+        pygame.mixer.music.stop()
+
+    def test_play(self):
+        self.assertFalse(self.music.is_playing())
+        self.music.play()
+        self.assertTrue(self.music.is_playing())
+        self.assertEqual(pygame.mixer.music.get_volume(), 0.5)
+
+        pygame.mixer.music.set_volume(0.25)
+        self.music.play()
+        self.assertEqual(pygame.mixer.music.get_volume(), 0.25)
+        self.music.play(restart=True)
+        self.assertEqual(pygame.mixer.music.get_volume(), 0.5)
+
+    def test_ramp(self):
+        self.music.fade_ms = False # as in pygame 1
+        self.music.fade = 1000
+        self.music.play()
+        scheduler.advance(0)
+        self.assertEqual(pygame.mixer.music.get_volume(), 0)
+        scheduler.advance(500)
+        self.assertAlmostEqual(pygame.mixer.music.get_volume(), 0.25, places=2)
+        scheduler.advance(600)
+        self.assertAlmostEqual(pygame.mixer.music.get_volume(), 0.5, places=2)
+        self.assertIsNone(self.music.ramp)
+
+    def test_fadeout(self):
+        self.music.play()
+        self.music.fadeout(1000)
+        self.assertTrue(pygame.mixer.music.get_busy())
+        self.assertFalse(self.music.is_playing())
+
+        self.music.play()
+        self.assertTrue(self.music.is_playing())
+
+
+if __name__ == "__main__":
+    unittest.main()
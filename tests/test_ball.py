@@ -152,7 +152,7 @@ class BallTestCase(unittest.TestCase):
 
         msg = "tile hit but not updated"
         self.assertFalse(tile.alive(), msg=msg)
-        self.assertEqual(pygame.event.poll().type, events.POINTS, msg=msg)
+        self.assertIn(events.Points(5), events.get(), msg=msg)
 
         self.ball.is_fiery = True
         tile = RegularTile(self.ball.rect.center[0] + 10, self.ball.rect.center[1])
@@ -164,7 +164,7 @@ class BallTestCase(unittest.TestCase):
         self.assertAlmostEqual(self.ball.vy, vy, msg=msg)
 
         msg = "ball is fiery but there was no explosion after hit"
-        self.assertIn(events.EXPLOSION, (event.type for event in pygame.event.get()), msg=msg)
+        self.assertIn(events.Explosion, (type(event) for event in events.get()), msg=msg)
 
 
 if __name__ == "__main__":
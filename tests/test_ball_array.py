@@ -0,0 +1,143 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+import math
+
+import pygame
+
+import events
+from ball import Ball
+from ball_array import BallArray
+from level import Level
+from paddle import Paddle
+from tiles import RegularTile, TileGroup
+from tile_grid import TileGrid
+from main import SCREEN_HEIGHT, SCREEN_WIDTH, MARGIN
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class BallArrayTestCase(unittest.TestCase):
+    def setUp(self):
+        Ball.reset_state()
+        ball = Ball()
+        ball.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        ball.vx, ball.vy = 1, 1
+        ball.is_attached = False
+        self.balls = BallArray(ball)
+
+    def test_add(self):
+        self.balls.add(Ball(), Ball())
+        self.assertEqual(len(self.balls), 3)
+        self.assertEqual([ball.is_attached for ball in self.balls.sprites()], [False, True, True])
+
+        self.balls.empty()
+        self.assertFalse(self.balls)
+
+    def test_update(self):
+        x0, y0 = self.balls.x[0], self.balls.y[0]
+        self.balls.update()
+        self.assertEqual((self.balls.x[0], self.balls.y[0]), (x0 + 1, y0 + 1))
+
+        self.balls.add(Ball(), Ball(), Ball())
+        self.balls.attached[1:] = False
+        self.balls.x[1], self.balls.vx[1] = MARGIN, -1
+        self.balls.x[2], self.balls.vy[2] = SCREEN_WIDTH // 2, -1
+        self.balls.y[2] = 2 * MARGIN
+        self.balls.y[3] = SCREEN_HEIGHT + 2 * MARGIN
+        self.balls.update()
+
+        self.assertEqual(len(self.balls), 3)
+        self.assertEqual(self.balls.x[1], MARGIN)
+        self.assertEqual(self.balls.vx[1], 1)
+        self.assertEqual(self.balls.y[2], 2 * MARGIN)
+        self.assertEqual(self.balls.vy[2], 1)
+
+    def test_substeps(self):
+        x0 = self.balls.x[0]
+        self.balls.vx[0] = 5
+        self.assertEqual(self.balls.max_speed(), 5)
+        for _ in range(4):
+            self.balls.update(substeps=4)
+        self.assertEqual(self.balls.x[0], x0 + 5)
+        self.assertEqual(self.balls.fx[0], 0)
+
+    def test_blits(self):
+        x0, y0 = self.balls.x[0], self.balls.y[0]
+        self.balls.vx[0], self.balls.vy[0] = 4, 4
+        self.balls.remember_positions()
+        self.balls.update()
+        self.assertEqual(self.balls.blits(0), [(Ball.image, (x0, y0))])
+        self.assertEqual(self.balls.blits(0.5), [(Ball.image, (x0 + 2, y0 + 2))])
+        self.assertEqual(self.balls.blits(), [(Ball.image, (x0 + 4, y0 + 4))])
+
+    def test_collide_paddle(self):
+        paddle = Paddle()
+        self.balls.x[0] = paddle.rect.left
+        self.balls.y[0] = paddle.rect.top - 8
+        self.balls.vx[0], self.balls.vy[0] = 5, 5
+        self.balls.collide_paddle(paddle)
+        self.assertLess(self.balls.vy[0], 0)
+        self.assertLess(self.balls.vx[0], 0)
+        self.assertGreater(math.hypot(self.balls.vx[0], self.balls.vy[0]), math.hypot(5, 5))
+
+        paddle.is_magnetic = True
+        self.balls.y[0] = paddle.rect.top - 8
+        self.balls.collide_paddle(paddle)
+        self.assertTrue(self.balls.attached[0])
+        self.assertEqual(self.balls.y[0] + self.balls.h, paddle.rect.top - 1)
+
+        x0 = self.balls.x[0]
+        self.balls.drag(10)
+        self.assertEqual(self.balls.x[0], x0 + 10)
+        self.balls.release(paddle)
+        self.assertFalse(self.balls.attached[0])
+        self.assertLess(self.balls.vy[0], 0)
+
+    def test_collide_tiles(self):
+        tiles = TileGroup()
+        tile = RegularTile(MARGIN, 3 * MARGIN)
+        tiles.add(tile)
+        self.balls.x[0], self.balls.y[0] = tile.rect.centerx, tile.rect.bottom - 2
+        self.balls.vx[0], self.balls.vy[0] = 1, -1
+        events.get()
+        self.balls.collide_tiles(tiles)
+        self.assertFalse(tile.alive())
+        self.assertEqual(self.balls.vy[0], 1)
+        self.assertIn(events.Points(5), events.get())
+
+    def test_collide_tiles_large(self):
+        tiles = TileGrid(40, 30)
+        tile = RegularTile(*TileGrid.cell_rect(39, 29).topleft) # beyond the 16x16 grid of a level
+        tiles.add(tile)
+        self.balls.x[0], self.balls.y[0] = tile.rect.centerx, tile.rect.bottom - 2
+        self.balls.vx[0], self.balls.vy[0] = 1, -1
+        self.balls.collide_tiles(tiles)
+        self.assertFalse(tile.alive())
+        self.assertFalse(tiles)
+
+    def test_split(self):
+        self.balls.split()
+        self.assertEqual(len(self.balls), 2)
+        self.assertEqual(self.balls.vx[1], -self.balls.vx[0])
+
+        self.balls.speed_up()
+        for vx, vy in zip(self.balls.vx, self.balls.vy):
+            self.assertAlmostEqual(math.hypot(vx, vy), Ball.MAXSPEED, -1)
+
+    def test_level(self):
+        Level.ball_engine = "array"
+        try:
+            lvl = Level(0)
+            self.assertIsInstance(lvl.balls, BallArray)
+            lvl.update(dx=10)
+            self.assertEqual(lvl.balls.sprites()[0].rect.centerx, SCREEN_WIDTH // 2 + 20)
+            lvl.release_balls()
+            self.assertFalse(lvl.balls.attached.any())
+        finally:
+            Level.ball_engine = "sprite"
+
+
+if __name__ == "__main__":
+    unittest.main()
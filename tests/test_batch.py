@@ -0,0 +1,53 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import collections
+import unittest
+
+import batch
+from level import Level
+from simulation import Simulation
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.prefetch = Simulation.prefetch
+        Simulation.prefetch = False
+
+    def tearDown(self):
+        Simulation.prefetch = self.prefetch
+
+    def test_play(self):
+        result = batch.play(1, seed=3, max_frames=1000)
+        self.assertEqual(result.frames, 1000)
+        self.assertGreater(result.score, 0)
+        self.assertEqual(batch.play(1, seed=3, max_frames=1000), result)
+
+    def test_tile_engine(self):
+        result = batch.play(1, seed=3, max_frames=1000)
+        Level.tile_engine = "grid"
+        try:
+            self.assertEqual(batch.play(1, seed=3, max_frames=1000), result)
+        finally:
+            Level.tile_engine = "sprite"
+
+    def test_run(self):
+        results = batch.run(1, games=2, max_frames=100, workers=2)
+        self.assertEqual(results, [batch.play(1, seed, max_frames=100) for seed in range(2)])
+        self.assertEqual(batch.run(1, games=2, max_frames=100, workers=2, tile_engine="grid"),
+                         results)
+
+    def test_summarize(self):
+        results = [
+            batch.Result(True, 100, 50, 0, collections.Counter(Split=1)),
+            batch.Result(False, 300, 10, 3, collections.Counter(Split=1, Life=2)),
+        ]
+        stats = batch.summarize(results)
+        self.assertEqual(stats["clear_rate"], 0.5)
+        self.assertEqual(stats["frames"], 200)
+        self.assertEqual(stats["score"]["min"], 10)
+        self.assertEqual(stats["score"]["max"], 50)
+        self.assertEqual(stats["deaths"], 1.5)
+        self.assertEqual(stats["bonuses"], {"Life": 1.0, "Split": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
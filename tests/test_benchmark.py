@@ -0,0 +1,50 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+import benchmark
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_scenarios(self):
+        for item in benchmark.BENCHMARKS:
+            repeats = benchmark.measure(item._replace(number=1, repeat=1))
+            self.assertEqual(len(repeats[0]), 1, msg=item.name)
+
+        lvl = benchmark.level(benchmark.RegularTile, balls=10, bonuses=5)
+        self.assertEqual(len(lvl.tiles), 256)
+        self.assertEqual(len(lvl.balls), 10)
+        self.assertEqual(len(lvl.bonuses), 5)
+
+    def test_allocations(self):
+        chain = [item for item in benchmark.BENCHMARKS if item.name == "explosion/chain"][0]
+        self.assertEqual(benchmark.allocations(chain), 0)
+
+        sizes = [pool.size for pool in benchmark.POOLS]
+        for pool in benchmark.POOLS:
+            pool.size = 0
+        try:
+            self.assertGreaterEqual(benchmark.allocations(chain), 256) # an explosion per cell
+        finally:
+            for pool, size in zip(benchmark.POOLS, sizes):
+                pool.size = size
+
+    def test_summarize(self):
+        stats = benchmark.summarize([[1000, 2000, 9000], [3000, 4000, 5000]])
+        self.assertEqual(stats["calls"], 6)
+        self.assertEqual(stats["min"], 1)
+        self.assertEqual(stats["median"], 2)
+        self.assertEqual(stats["p95"], 9)
+
+        ratios, slower = benchmark.compare({"a": stats, "b": stats}, {"a": {"median": 1}}, 0.5)
+        self.assertEqual(ratios, {"a": 2})
+        self.assertEqual(slower, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
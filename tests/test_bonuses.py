@@ -20,12 +20,12 @@ game = Game.RunningGame()
 class BonusTestCase(unittest.TestCase):
     def test_on_collect(self):
         Bonus.on_collect()
-        self.assertEqual(pygame.event.poll().type, events.POINTS)
-        self.assertEqual(pygame.event.poll().type, events.BONUS_COLLECTED)
+        queued = [type(event) for event in events.get()]
+        self.assertEqual(queued, [events.BonusCollected, events.Points])
 
     def test_random_bonus(self):
         random_bonus(0, 0)
-        self.assertEqual(pygame.event.poll().type, events.BONUS_DROPPED)
+        self.assertEqual(type(events.get()[0]), events.BonusDropped)
 
 
 class DeathTestCase(unittest.TestCase):
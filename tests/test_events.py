@@ -0,0 +1,45 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import events
+
+
+class BusTestCase(unittest.TestCase):
+    def setUp(self):
+        self.bus = events.Bus()
+        self.handled = []
+
+    def test_post(self):
+        self.bus.post(events.Points(5))
+        self.bus.post(events.Explosion((0, 0)))
+        self.bus.post(events.Points(10))
+        self.bus.post(events.Death())
+        self.assertEqual(self.bus.get(),
+                         [events.Explosion((0, 0)), events.Death(), events.Points(15)])
+        self.assertEqual(self.bus.get(), [])
+
+    def test_dispatch(self):
+        self.bus.subscribe(events.Death, self.handled.append)
+        self.bus.subscribe(events.Points, self.handled.append)
+        self.bus.subscribe(events.Points, lambda event: self.bus.post(events.Death()))
+        self.bus.post(events.Points(5))
+        self.bus.post(events.GameOver(won=True))
+        self.bus.dispatch()
+        self.assertEqual(self.handled, [events.Points(5)])
+
+        self.bus.unsubscribe(events.Points, self.handled.append)
+        self.bus.dispatch()
+        self.assertEqual(self.handled, [events.Points(5), events.Death()])
+
+    def test_current_bus(self):
+        bus = events.bus
+        events.bus = self.bus
+        try:
+            events.post(events.Death())
+            self.assertEqual(events.get(), [events.Death()])
+        finally:
+            events.bus = bus
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+import fonts
+
+
+pygame.init()
+
+
+class FontsTestCase(unittest.TestCase):
+    def test_render(self):
+        text = fonts.render("regular_font", "test")
+        self.assertIs(fonts.render("regular_font", "test", pygame.Color("white")), text)
+        self.assertIsNot(fonts.render("regular_font", "test", (0, 0, 0)), text)
+        self.assertEqual(text.get_size(), fonts.regular_font.size("test"))
+
+    def test_number(self):
+        text = fonts.number("regular_font", 120)
+        widths = [fonts.render("regular_font", digit).get_width() for digit in "120"]
+        self.assertEqual(text.get_width(), sum(widths))
+        self.assertEqual(text.get_height(), fonts.render("regular_font", "0").get_height())
+
+    def test_fade(self):
+        text = fonts.fade("regular_font", "test", 100)
+        self.assertEqual(text.get_alpha(), 100)
+        self.assertIs(fonts.fade("regular_font", "test", 200), text)
+        self.assertEqual(text.get_alpha(), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,16 @@
 # pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
 import unittest
 import os
-import pickle
 
 import pygame
 
 import events
+import inputs
 from game import Game
 from bonuses import FireBall
+from explosion import Explosion
+from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN, FPS, MAX_FPS
+from timers import scheduler
 
 
 pygame.init()
@@ -21,11 +24,21 @@ class GameTestCase(unittest.TestCase):
     def test_init(self):
         self.assertTrue(isinstance(self.game.state, Game.StartScreen))
 
+    def test_max_fps(self):
+        self.assertEqual(self.game.max_fps(), FPS)
+        self.game.state = Game.RunningGame(start_lvl=0)
+        self.assertEqual(self.game.max_fps(), MAX_FPS)
+
 
 class StartScreenTestCase(unittest.TestCase):
     def setUp(self):
         self.game = Game(start_lvl=0)
 
+    def test_idle(self):
+        self.assertEqual(self.game.idle(), 0)
+        scheduler.advance(2000)
+        self.assertEqual(self.game.idle(), 1000 // Game.attract_fps)
+
     def test_eventloop(self):
         pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
         self.game.eventloop()
@@ -58,7 +71,39 @@ class RunningGameTestCase(unittest.TestCase):
 
         self.state.lives = 0
         self.state.on_death()
-        self.assertIn(events.GAME_OVER, (event.type for event in pygame.event.get()))
+        self.assertIn(events.GameOver, (type(event) for event in events.get()))
+
+    def test_freeze(self):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # pylint: disable=too-many-function-args
+        self.state.lvl.n = 1
+        self.state.on_death()
+        self.assertEqual(self.state.lives, 1)
+        self.assertTrue(self.state.frozen)
+        inputs.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(5, 0)))
+        self.assertEqual(self.game.draw(surface), [])
+        self.assertIsNone(inputs.mouse.unshown) # not counted as input latency
+
+        scheduler.advance(Game.RunningGame.death_delay)
+        self.assertFalse(self.state.frozen)
+        self.assertTrue(self.game.draw(surface))
+
+    def test_idle(self):
+        self.assertEqual(self.game.idle(), 0)
+        self.state.toggle_pause()
+        self.assertEqual(self.game.idle(), Game.idle_timeout)
+        self.state.lvl.explosions.add(Explosion(0, 0, mute=True))
+        self.assertEqual(self.game.idle(), 0)
+
+    def test_draw(self):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # pylint: disable=too-many-function-args
+        self.state.dirty_rects = False
+        self.assertIsNone(self.game.draw(surface))
+
+        self.state.dirty_rects = True
+        self.assertEqual(self.game.draw(surface), [surface.get_rect()])
+        self.state.score = 10
+        rects = self.game.draw(surface)
+        self.assertTrue(any(rect.left == MARGIN + 10 for rect in rects))
 
     def test_next_level(self):
         self.state.n_lvl = -1
@@ -67,7 +112,7 @@ class RunningGameTestCase(unittest.TestCase):
 
         self.state.n_lvl = 100
         self.state.next_level()
-        self.assertIn(events.GAME_OVER, (event.type for event in pygame.event.get()))
+        self.assertIn(events.GameOver, (type(event) for event in events.get()))
 
     def test_eventloop(self):
         pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
@@ -92,18 +137,15 @@ class RunningGameTestCase(unittest.TestCase):
 
         bonus = FireBall(0, 0)
 
-        event = pygame.event.Event(events.BONUS_DROPPED, bonus=bonus)
-        pygame.event.post(event)
+        events.post(events.BonusDropped(bonus=bonus))
         self.game.eventloop()
-        self.assertIn(event.bonus, self.state.lvl.bonuses)
+        self.assertIn(bonus, self.state.lvl.bonuses)
 
-        event = pygame.event.Event(events.BONUS_COLLECTED, bonus=bonus)
-        pygame.event.post(event)
+        events.post(events.BonusCollected(bonus=bonus))
         self.game.eventloop()
         self.assertTrue(self.state.lvl.balls.sprites()[0].is_fiery)
 
-        event = pygame.event.Event(events.POINTS, points=10)
-        pygame.event.post(event)
+        events.post(events.Points(points=10))
         self.game.eventloop()
         self.assertEqual(self.state.score, 10)
 
@@ -113,15 +155,15 @@ class RunningGameTestCase(unittest.TestCase):
         self.assertTrue(isinstance(self.game.state, Game.StartScreen))
 
         self.game.state = Game.RunningGame(start_lvl=0)
-        event = pygame.event.Event(events.GAME_OVER, won=False)
-        pygame.event.post(event)
+        events.post(events.GameOver(won=False))
         self.game.eventloop()
         self.assertTrue(isinstance(self.game.state, Game.RankingTransition))
 
 
 class RankingTransitionTestCase(unittest.TestCase):
     def setUp(self):
-        Game.ranking_path = "test_rank.pkl"
+        Game.ranking_path = "test_scores.db"
+        Game.legacy_ranking_path = None
         self.game = Game(start_lvl=0)
         self.game.state = Game.RankingTransition(score=-10, won=False)
         self.state = self.game.state
@@ -144,17 +186,51 @@ class RankingTransitionTestCase(unittest.TestCase):
         self.state.score = -1
         self.state.update_ranking()
         self.assertTrue(os.path.exists(Game.ranking_path))
-        with open(Game.ranking_path, "rb") as f:
-            rank = pickle.load(f)
-        self.assertEqual(rank, [("test", -1)])
+        self.assertEqual(self.state.ranking, [("test", -1)])
+
+        for score in range(6):
+            self.state.score = score
+            self.state.update_ranking()
+        test_rank = [("test", 5), ("test", 4), ("test", 3), ("test", 2), ("test", 1)]
+        self.assertEqual(self.state.ranking, test_rank)
+        self.assertEqual(Game.Ranking().ranking, test_rank)
+        self.assertFalse(Game.RankingTransition(score=1, won=False).ask_name)
+        self.assertTrue(Game.RankingTransition(score=2, won=False).ask_name)
+
+    def test_finish(self):
+        self.assertEqual(self.state.stage, 0)
+        scheduler.advance(3500)
+        self.assertEqual(self.state.stage, 2)
+        scheduler.advance(10000)
+        self.assertEqual(self.state.stage, 3)
+        self.assertFalse(self.state.finished)
+
+        for score in range(Game.ranking_size):
+            self.state.store.add("test", score, self.state.pack)
+        self.game.state = Game.RankingTransition(score=-10, won=False)
+        self.assertFalse(self.game.state.ask_name)
+        scheduler.advance(5000)
+        self.game.eventloop()
+        self.assertTrue(isinstance(self.game.state, Game.Ranking))
 
-        test_rank = [("test", 5), ("test", 4), ("test", 3), ("test", 2), ("test", 1), ("test", 0)]
-        self.state.ranking = list(reversed(test_rank))
-        self.state.update_ranking()
-        self.assertTrue(os.path.exists(Game.ranking_path))
-        with open(Game.ranking_path, "rb") as f:
-            rank = pickle.load(f)
-        self.assertEqual(rank, self.state.ranking[-5:])
+    def test_idle(self):
+        scheduler.clear()
+        self.game.state = state = Game.RankingTransition(score=-10, won=False)
+        self.assertEqual(self.game.idle(), 0) # the title fades in
+        scheduler.advance(3000)
+        self.assertEqual(self.game.idle(), 500) # the next stage
+        scheduler.advance(1100)
+        self.assertEqual(state.stage, 3)
+        self.assertEqual(self.game.idle(), 400) # the cursor blinks
+        scheduler.advance(400)
+        self.assertEqual(self.game.idle(), 500)
+
+        for score in range(Game.ranking_size):
+            state.store.add("test", score, state.pack)
+        scheduler.clear()
+        self.game.state = Game.RankingTransition(score=-10, won=False)
+        scheduler.advance(4500)
+        self.assertEqual(self.game.idle(), 500) # until it finishes
 
     def test_eventloop(self):
         event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_t, unicode="t")
@@ -193,9 +269,24 @@ class RankingTransitionTestCase(unittest.TestCase):
 
 class RankingTestCase(unittest.TestCase):
     def setUp(self):
+        Game.ranking_path = "test_scores.db"
+        Game.legacy_ranking_path = None
         self.game = Game(start_lvl=0)
         self.game.state = Game.Ranking()
 
+    def tearDown(self):
+        os.remove(Game.ranking_path)
+
+    def test_idle(self):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # pylint: disable=too-many-function-args
+        self.assertEqual(self.game.idle(), 0)
+        self.assertIsNone(self.game.draw(surface))
+        self.assertEqual(self.game.idle(), Game.idle_timeout)
+        self.assertEqual(self.game.draw(surface), [])
+
+        self.game.invalidate()
+        self.assertEqual(self.game.idle(), 0)
+
     def test_eventloop(self):
         event = pygame.event.Event(pygame.KEYUP, key=pygame.K_ESCAPE)
         pygame.event.post(event)
@@ -208,6 +299,12 @@ class RankingTestCase(unittest.TestCase):
         self.game.eventloop()
         self.assertTrue(isinstance(self.game.state, Game.StartScreen))
 
+        self.game.state = Game.Ranking()
+        event = pygame.event.Event(pygame.KEYUP, key=pygame.K_t)
+        pygame.event.post(event)
+        self.game.eventloop()
+        self.assertTrue(self.game.state.today)
+
         self.game.state = Game.Ranking()
         event = pygame.event.Event(pygame.MOUSEBUTTONUP)
         pygame.event.post(event)
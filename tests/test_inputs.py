@@ -0,0 +1,55 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+import timing
+from inputs import Mouse
+
+
+pygame.init()
+
+
+class MouseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mouse = Mouse()
+        self.timer = timing.start()
+
+    def tearDown(self):
+        timing.timer = None
+
+    def test_take(self):
+        self.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(5, 1)))
+        self.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(-2, 0)))
+        self.assertEqual(self.mouse.pending(), 3)
+        self.assertEqual(self.mouse.take(), 3)
+        self.assertEqual(self.mouse.take(), 0)
+
+        self.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(5, 1)))
+        self.mouse.clear()
+        self.assertEqual(self.mouse.pending(), 0)
+        self.assertIsNone(self.mouse.unshown)
+
+    def test_latency(self):
+        self.mouse.flipped()
+        self.timer.end_frame()
+        self.assertIsNone(self.timer.percentile("latency", 50))
+
+        self.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(5, 1)))
+        first = self.mouse.unshown
+        self.mouse.add(pygame.event.Event(pygame.MOUSEMOTION, rel=(5, 1)))
+        self.assertEqual(self.mouse.unshown, first)
+        self.mouse.drawn()
+        self.mouse.take()
+        self.mouse.flipped()
+        self.timer.end_frame()
+        self.assertGreaterEqual(self.timer.percentile("latency", 50), 0)
+        self.assertIn("input", self.timer.summary())
+
+        self.mouse.flipped()
+        self.timer.end_frame()
+        self.assertEqual(len(self.timer.recent["latency"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,9 @@ import unittest
 import pygame
 
 import events
-from main import MARGIN
+from main import SCREEN_WIDTH, SCREEN_HEIGHT, MARGIN
 from level import Level
-from tiles import RegularTile
+from tiles import RegularTile, ExplosiveTile
 from bonuses import FireBall
 
 
@@ -36,13 +36,13 @@ class LevelTestCase(unittest.TestCase):
 
         self.ball.kill()
         self.lvl.update()
-        self.assertNotIn(events.DEATH, (event.type for event in pygame.event.get()))
+        self.assertNotIn(events.Death, (type(event) for event in events.get()))
 
         self.lvl.finished = False
 
         self.ball.kill()
         self.lvl.update()
-        self.assertIn(events.DEATH, (event.type for event in pygame.event.get()))
+        self.assertIn(events.Death, (type(event) for event in events.get()))
 
     def test_detect_collisions(self):
         self.ball.rect.center = self.lvl.paddle.rect.center
@@ -57,18 +57,140 @@ class LevelTestCase(unittest.TestCase):
         self.lvl.detect_collisions()
         self.assertFalse(bonus.alive())
 
+    def test_broadphase(self):
+        self.lvl.broadphase = "sprite"
+        self.ball.rect.center = self.lvl.tile_matrix[0][0].rect.center
+        self.lvl.detect_collisions()
+        self.assertFalse(self.lvl.tile_matrix[0][0].alive())
+
+        self.lvl.broadphase = "grid"
+        tile = RegularTile(MARGIN + 60, 3 * MARGIN)
+        self.lvl.tile_matrix[1][0] = tile
+        self.lvl.tiles.add(tile)
+        self.ball.rect.center = tile.rect.midleft
+        self.lvl.detect_collisions()
+        self.assertFalse(tile.alive())
+        self.assertFalse(self.lvl.tiles.cells)
+
     def test_explosion(self):
         self.lvl.explosion(60 + MARGIN, 30 + 3 * MARGIN)
         self.assertFalse(self.lvl.tile_matrix[0][0].alive())
         self.assertTrue(self.lvl.explosions)
 
+    def test_chain_reaction(self):
+        # a row of explosive tiles along the top edge and a tile at the
+        # bottom, which used to be hit through negative index wraparound
+        for i in range(1, 16):
+            self.add_tile(ExplosiveTile, i, 0)
+        self.add_tile(RegularTile, 0, 15)
+        self.add_tile(RegularTile, 15, 2)
+        events.get()
+
+        self.lvl.explosion(MARGIN, 3 * MARGIN)
+        self.assertEqual(
+            [tile.rect.topleft for tile in self.lvl.tiles],
+            [(MARGIN, 3 * MARGIN + 15 * 30), (MARGIN + 15 * 60, 3 * MARGIN + 2 * 30)]
+        )
+        self.assertEqual(len(self.lvl.explosions), 16 * 2)
+        self.assertNotIn(events.Explosion, (type(event) for event in events.get()))
+
+        self.lvl.explosion(MARGIN, 3 * MARGIN)
+        self.assertEqual(len(self.lvl.explosions), 16 * 2)
+        self.assertFalse(events.get())
+
+    def add_tile(self, cls, i, j):
+        tile = cls(MARGIN + 60 * i, 3 * MARGIN + 30 * j)
+        self.lvl.tile_matrix[i][j] = tile
+        self.lvl.tiles.add(tile)
+
+    def test_draw_dirty(self):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # pylint: disable=too-many-function-args
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # pylint: disable=too-many-function-args
+        self.assertEqual(self.lvl.draw_dirty(surface, background), [surface.get_rect()])
+
+        rects = self.lvl.draw_dirty(surface, background)
+        self.assertIn(self.lvl.paddle.rect, rects)
+        self.assertNotIn(self.lvl.tile_matrix[0][0].rect, rects)
+        self.assertEqual(self.lvl.bake(background), [])
+
+        self.lvl.tile_matrix[0][0].kill()
+        rects = self.lvl.draw_dirty(surface, background)
+        self.assertIn(self.lvl.tile_matrix[0][0].rect, rects)
+        center = self.lvl.tile_matrix[0][0].rect.center
+        self.assertEqual(surface.get_at(center), (0, 0, 0, 255))
+        self.assertEqual(self.lvl.layer.get_at(center), (0, 0, 0, 255))
+
+    def test_substeps(self):
+        # a fast ball right below a tile would jump over it in a single move
+        tile = self.lvl.tile_matrix[0][0]
+        self.lvl.release_balls()
+        self.ball.rect.midtop = tile.rect.midbottom
+        self.ball.rect.y += 1
+        self.ball.vx, self.ball.vy = 0, -50
+        self.assertEqual(self.lvl.substeps(), 7)
+        self.lvl.update(dx=0)
+        self.assertFalse(tile.alive())
+        self.assertGreater(self.ball.vy, 0)
+
+    def test_sprite_blits(self):
+        self.lvl.release_balls()
+        self.ball.vx, self.ball.vy = 4, -4
+        x0, y0 = self.ball.rect.topleft
+        self.lvl.update(dx=10)
+        self.assertEqual(self.ball.rect.topleft, (x0 + 4, y0 - 4))
+
+        blits = self.lvl.sprite_blits(0)
+        self.assertIn((self.ball.image, (x0, y0)), blits)
+        self.assertIn((self.lvl.paddle.image, self.lvl.paddle.rect.topleft), blits)
+        self.assertIn((self.ball.image, (x0 + 2, y0 - 2)), self.lvl.sprite_blits(0.5))
+        self.assertIn((self.ball.image, self.ball.rect.topleft), self.lvl.sprite_blits(1))
+
+    def test_lookahead(self):
+        paddle = self.lvl.paddle
+        x, y = paddle.rect.topleft
+        self.lvl.lookahead = 10
+        self.assertIn((paddle.image, (x + 10, y)), self.lvl.sprite_blits(0))
+        self.assertIn((self.ball.image, self.ball.rect.move(10, 0).topleft),
+                      self.lvl.sprite_blits(0))
+
+        self.lvl.lookahead = -SCREEN_WIDTH
+        self.assertIn((paddle.image, (MARGIN, y)), self.lvl.sprite_blits())
+        self.lvl.paused = True
+        self.assertIn((paddle.image, (x, y)), self.lvl.sprite_blits())
+
+    def test_paddle_substeps(self):
+        # the ball falls by 40 px while the paddle jumps under it
+        self.lvl.release_balls()
+        paddle = self.lvl.paddle
+        self.ball.rect.bottom = paddle.rect.top - 20
+        self.ball.rect.centerx = paddle.rect.centerx + 120
+        self.ball.vx, self.ball.vy = 0, 40
+        Level.paddle_substeps = True
+        try:
+            self.assertEqual(self.lvl.substeps(200), 25)
+            self.lvl.update(dx=200)
+        finally:
+            Level.paddle_substeps = False
+        self.assertLess(self.ball.vy, 0)
+
     def test_on_death(self):
         paddle = self.lvl.paddle
+        paddle.is_magnetic = True
+        paddle.rect.move_ip(50, 0)
+        self.ball.is_attached = False
+        self.ball.rect.move_ip(0, -100)
         self.lvl.bonuses.add(FireBall(0, 0))
         self.lvl.on_death()
-        self.assertIsNot(paddle, self.lvl.paddle)
+        self.assertIs(paddle, self.lvl.paddle) # reset, not rebuilt
+        self.assertFalse(paddle.is_magnetic)
+        self.assertEqual(paddle.rect.centerx, SCREEN_WIDTH // 2)
         self.assertFalse(self.lvl.bonuses)
-        self.assertIsNot(self.lvl.balls.sprites()[0], self.ball)
+
+        ball = self.lvl.balls.sprites()[0]
+        self.assertEqual(len(self.lvl.balls), 1)
+        self.assertTrue(ball.is_attached)
+        self.assertEqual(paddle.attached_balls, {ball})
+        self.assertEqual(ball.rect.centery, SCREEN_HEIGHT - MARGIN - 20)
 
 
 if __name__ == "__main__":
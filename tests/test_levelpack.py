@@ -0,0 +1,63 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import os
+import unittest
+
+import levelpack
+
+
+class LevelPackTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_levels.pack"
+        self.grid = levelpack.parse("0 0 r\n\n15 15 e\n3 2 g\n3 4 u\n")
+        levelpack.write(self.path, {1: self.grid, 7: levelpack.parse("")})
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_parse(self):
+        self.assertEqual(self.grid[0][0], "r")
+        self.assertEqual(self.grid[15][15], "e")
+        self.assertEqual(self.grid[2][3], "g")
+        self.assertIsNone(self.grid[3][2])
+
+        for text in ("1 2", "1 2 x", "1 16 r", "-1 2 r"):
+            with self.assertRaises(levelpack.LevelPackError, msg=text):
+                levelpack.parse(text)
+
+    def test_read(self):
+        pack = levelpack.LevelPack(self.path)
+        try:
+            self.assertEqual(len(pack), 2)
+            self.assertEqual(list(pack), [1, 7])
+            self.assertNotIn(2, pack)
+            with self.assertRaises(KeyError):
+                pack[2] # pylint: disable=pointless-statement
+
+            record = pack[1]
+            self.assertEqual(record.grid, self.grid)
+            self.assertEqual(record.counts, {"r": 1, "g": 1, "b": 0, "u": 1, "e": 1})
+            self.assertEqual(record.max_score, 5 + 10 + 20 + 15)
+            self.assertEqual(pack[7].max_score, 0)
+        finally:
+            pack.close()
+
+    def test_invalid(self):
+        with open(self.path, "r+b") as file:
+            file.write(b"PK")
+        with self.assertRaises(levelpack.LevelPackError):
+            levelpack.LevelPack(self.path)
+
+        with open(self.path, "wb") as file:
+            file.write(levelpack.HEADER.pack(levelpack.MAGIC, levelpack.VERSION, 1000))
+        with self.assertRaises(levelpack.LevelPackError):
+            levelpack.LevelPack(self.path)
+
+    def test_shipped(self):
+        pack = levelpack.get(os.path.join("levels", "levels.pack"))
+        self.assertIn(1, pack)
+        with open(os.path.join("levels", "1.txt"), encoding="utf-8") as file:
+            self.assertEqual(pack[1].grid, levelpack.parse(file.read()))
+
+
+if __name__ == "__main__":
+    unittest.main()
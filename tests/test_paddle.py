@@ -60,6 +60,19 @@ class PaddleTestCase(unittest.TestCase):
         self.paddle.update(dx=-SCREEN_WIDTH)
         self.assertEqual(self.paddle.rect.left, MARGIN, msg=msg)
 
+    def test_resize(self):
+        w = len(self.paddle)
+        self.paddle.resize(-2)
+        self.assertEqual(len(self.paddle), w // 4)
+        self.paddle.resize(2)
+        self.assertEqual(len(self.paddle), 4 * w)
+        self.assertIs(self.paddle.image, Paddle.scaled_image("base", 2))
+
+        self.paddle.is_magnetic = True
+        self.paddle.resize(0)
+        self.assertIs(self.paddle.image, Paddle.images["magnetic"])
+        self.assertEqual(self.paddle.rect.center, (SCREEN_WIDTH // 2, SCREEN_HEIGHT - MARGIN))
+
     def test_draw(self):
         surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))  # pylint: disable=too-many-function-args
         self.paddle.draw(surface)
@@ -0,0 +1,68 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import pygame
+
+from pools import Pool
+from ball import Ball
+from bonuses import Bonus, FireBall, Split
+from explosion import Explosion
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pools = Ball.pool, Bonus.pool, Explosion.pool
+        Ball.pool, Bonus.pool, Explosion.pool = Pool(size=2), Pool(size=2), Pool(size=2)
+        self.group = pygame.sprite.Group()
+
+    def tearDown(self):
+        Ball.pool, Bonus.pool, Explosion.pool = self.pools
+
+    def test_reuse(self):
+        explosion = Explosion.get(10, 10, mute=True)
+        self.group.add(explosion)
+        for _ in range(Explosion.FRAMES):
+            explosion.update()
+        self.assertFalse(explosion.alive())
+
+        again = Explosion.get(100, 100, mute=True)
+        self.assertIs(again, explosion)
+        self.assertEqual(again.frame, 0)
+        self.assertEqual(again.rect.center, (100, 100))
+        self.assertEqual(Explosion.pool.stats(), {"allocated": 1, "reused": 1, "discarded": 0})
+
+    def test_types(self):
+        bonus = FireBall.get(0, 0)
+        self.group.add(bonus)
+        bonus.kill()
+        self.assertIsNot(Split.get(0, 0), bonus)
+        self.assertIs(FireBall.get(0, 0), bonus)
+
+    def test_kill(self):
+        ball = Ball.get()
+        ball.kill() # not in a group, so not released
+        self.group.add(ball)
+        ball.kill()
+        ball.kill()
+        self.assertEqual(Ball.pool.free[Ball], [ball])
+
+        ball = Ball.get()
+        self.assertTrue(ball.is_attached)
+        self.assertIsNone(ball.moved)
+
+    def test_size(self):
+        balls = [Ball.get() for _ in range(3)]
+        self.group.add(*balls)
+        for ball in balls:
+            ball.kill()
+        self.assertEqual(len(Ball.pool.free[Ball]), 2)
+        self.assertEqual(Ball.pool.discarded, 1)
+        self.assertEqual(Ball.pool.allocated, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
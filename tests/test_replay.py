@@ -0,0 +1,114 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import os
+import unittest
+
+import pygame
+
+import inputs
+import levelpack
+import timers
+from game import Game
+from level import Level
+from replay import Recording
+from simulation import Simulation
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class RecordingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_recording.rec"
+
+    def tearDown(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def test_replay(self):
+        recording = Recording(start_lvl=1, seed=1234)
+        recording.start()
+        sim = Simulation(recording.start_lvl)
+        for frame in range(3000):
+            # follow the first ball, click now and then
+            paddle, balls = sim.lvl.paddle, sim.lvl.balls.sprites()
+            dx = max(-15, min(15, balls[0].rect.centerx - paddle.rect.centerx)) if balls else 0
+            clicks = int(frame % 200 == 0)
+            pause = frame in (1000, 1010)
+            recording.record(dx, clicks, pause)
+            sim.step(dx, clicks, pause)
+        sim.step()
+
+        recording.save(self.path)
+        loaded = Recording.load(self.path)
+        self.assertEqual(loaded.seed, 1234)
+        self.assertEqual(loaded.frames, recording.frames)
+        self.assertTrue(loaded.frames[1000].pause)
+
+        replayed = loaded.play()
+        self.assertGreater(sim.score, 0)
+        self.assertEqual((replayed.score, replayed.lives, replayed.n_lvl),
+                         (sim.score, sim.lives, sim.n_lvl))
+        self.assertEqual(sorted(tile.rect.topleft for tile in replayed.lvl.tiles),
+                         sorted(tile.rect.topleft for tile in sim.lvl.tiles))
+
+    def test_load(self):
+        with open(self.path, "wb") as file:
+            file.write(b"BZRC")
+        with self.assertRaises(ValueError):
+            Recording.load(self.path)
+
+    def test_record(self):
+        game = Game(start_lvl=0, record=self.path)
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
+        game.eventloop()
+        game.eventloop()
+        self.assertIsInstance(game.state, Game.RunningGame)
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
+        game.eventloop()
+        game.update()
+        self.assertEqual(game.state.recording.frames, [(0, 1, False)])
+
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_ESCAPE))
+        game.eventloop()
+        self.assertEqual(len(Recording.load(self.path).frames), 1)
+
+    def test_round_trip(self):
+        # a single level full of explosive tiles, cleared by the first hit
+        pack, Level.pack = Level.pack, "test_levels.pack"
+        levelpack.write(Level.pack, {1: [["e"] * levelpack.ROWS for _ in range(levelpack.COLUMNS)]})
+        try:
+            game = Game(start_lvl=1, record=self.path)
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
+            game.eventloop()
+            inputs.mouse.clear()
+            state = game.state
+            for _ in range(2000):
+                if game.state is not state:
+                    break
+                balls = state.lvl.balls.sprites()
+                dx = balls[0].rect.centerx - state.lvl.paddle.rect.centerx if balls else 0
+                dx = max(-15, min(15, dx))
+                pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, rel=(dx, 0)))
+                pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP))
+                game.eventloop()
+                game.update()
+                timers.scheduler.advance(17)
+            self.assertIsInstance(game.state, Game.RankingTransition)
+            self.assertTrue(state.won)
+
+            replayed = Recording.load(self.path).play()
+            self.assertTrue(replayed.over)
+            self.assertTrue(replayed.won)
+            self.assertEqual((replayed.final_score, replayed.n_lvl),
+                             (state.final_score, state.n_lvl))
+        finally:
+            levelpack.packs.pop(Level.pack).close()
+            os.remove(Level.pack)
+            Level.pack = pack
+
+
+if __name__ == "__main__":
+    unittest.main()
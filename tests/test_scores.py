@@ -0,0 +1,83 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import os
+import pickle
+import threading
+import unittest
+
+from scores import ScoreStore
+
+
+class ScoreStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_scores.db"
+        self.store = ScoreStore(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_top(self):
+        self.assertEqual(self.store.top("levels.pack"), [])
+        self.store.add("a", 10, "levels.pack", day="2020-01-01")
+        self.store.add("b", 30, "levels.pack", day="2020-01-02")
+        self.store.add("c", 10, "levels.pack", day="2020-01-02")
+        self.store.add("d", 50, "other.pack", day="2020-01-02")
+
+        self.assertEqual(self.store.top("levels.pack"), [("b", 30), ("a", 10), ("c", 10)])
+        self.assertEqual(self.store.top("levels.pack", k=1), [("b", 30)])
+        self.assertEqual(self.store.top("levels.pack", day="2020-01-02"), [("b", 30), ("c", 10)])
+        self.assertEqual(self.store.top("other.pack"), [("d", 50)])
+
+    def test_legacy(self):
+        legacy = "test_rank.pkl"
+        with open(legacy, "wb") as f:
+            pickle.dump([("a", 20), ("b", 10)], f)
+        try:
+            store = ScoreStore(self.path, legacy=legacy)
+            self.assertEqual(store.top("levels.pack"), [("a", 20), ("b", 10)])
+            self.assertTrue(os.path.exists(legacy))
+
+            store = ScoreStore(self.path, legacy=legacy) # imported only once
+            store.add("c", 15, "levels.pack")
+            self.assertEqual(store.top("levels.pack"), [("a", 20), ("c", 15), ("b", 10)])
+        finally:
+            os.remove(legacy)
+
+    def test_concurrent(self):
+        # each instance uses its own store, as separate games would
+        def play(name):
+            store = ScoreStore(self.path)
+            for score in range(20):
+                store.add(name, score, "levels.pack")
+
+        self.store.top("levels.pack")
+        threads = [threading.Thread(target=play, args=(f"p{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store.top("levels.pack", k=1000)), 4 * 20)
+
+    def test_concurrent_legacy(self):
+        legacy = "test_rank.pkl"
+        with open(legacy, "wb") as f:
+            pickle.dump([("a", 20), ("b", 10)], f)
+        barrier = threading.Barrier(8)
+
+        def start():
+            store = ScoreStore(self.path, legacy=legacy)
+            barrier.wait()
+            store.top("levels.pack")
+
+        try:
+            threads = [threading.Thread(target=start) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(self.store.top("levels.pack"), [("a", 20), ("b", 10)])
+        finally:
+            os.remove(legacy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+import events
+from ball import Ball
+from bonuses import Death
+from level import Level
+from main import MARGIN
+from simulation import Simulation
+from tiles import RegularTile
+
+
+class SimulationTestCase(unittest.TestCase):
+    def setUp(self):
+        events.get()
+        self.sim = Simulation(start_lvl=0)
+        tile = RegularTile(MARGIN, 3 * MARGIN)
+        self.sim.lvl.tile_matrix[0][0] = tile
+        self.sim.lvl.tiles.add(tile)
+
+    def test_init(self):
+        self.assertEqual(self.sim.lives, 2)
+        self.assertEqual(self.sim.score, 0)
+        self.assertFalse(self.sim.over)
+
+    def test_step(self):
+        paddle = self.sim.lvl.paddle
+        ball = self.sim.lvl.balls.sprites()[0]
+        x0 = paddle.rect.left
+        self.sim.step(dx=10)
+        self.assertEqual(paddle.rect.left, x0 + 10)
+        self.assertTrue(ball.is_attached)
+
+        self.sim.step(click=True)
+        self.assertFalse(ball.is_attached)
+        self.assertFalse(paddle.attached_balls)
+
+    def test_handle(self):
+        events.post(events.Points(points=5))
+        events.post(events.Points(points=10))
+        self.sim.step()
+        self.assertEqual(self.sim.score, 15)
+
+        self.sim.lvl.balls.empty()
+        self.sim.step()
+        self.sim.step()
+        self.assertEqual(self.sim.lives, 1)
+        self.assertTrue(self.sim.lvl.balls)
+
+    def test_deaths(self):
+        self.sim.lvl.balls.empty()
+        self.sim.step()
+        self.sim.step()
+        Death.take_effect(self.sim) # doesn't post a Death event
+        self.assertEqual(self.sim.deaths, 2)
+
+    def test_game_over(self):
+        self.sim.lives = 0
+        self.sim.on_death()
+        self.sim.step()
+        self.assertTrue(self.sim.over)
+        self.assertFalse(self.sim.won)
+
+        self.sim = Simulation(start_lvl=0)
+        self.sim.n_lvl = 100
+        self.sim.lvl.finished = True
+        self.sim.step(click=True)
+        self.sim.step()
+        self.assertTrue(self.sim.over)
+        self.assertTrue(self.sim.won)
+        self.assertEqual(self.sim.final_score, 100 * 1000)
+
+    def test_prefetch(self):
+        self.sim.lvl.finished = True
+        Ball.is_fiery = True
+        self.sim.step()
+        n, future = self.sim.prefetched
+        self.assertEqual(n, 1)
+
+        self.assertEqual(future.result(), Level.read(1))
+        self.assertTrue(Ball.is_fiery) # the level being played is left alone
+        self.sim.step(click=True)
+        self.assertFalse(Ball.is_fiery)
+        self.assertEqual(self.sim.lvl.n, 1)
+        self.assertTrue(self.sim.lvl.tiles)
+        self.assertIsNone(self.sim.prefetched)
+
+        self.sim.n_lvl = 100
+        self.sim.lvl.finished = True
+        self.sim.step()
+        self.sim.step(click=True)
+        self.sim.step()
+        self.assertTrue(self.sim.over)
+        self.assertTrue(self.sim.won)
+
+
+if __name__ == "__main__":
+    unittest.main()
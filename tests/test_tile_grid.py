@@ -0,0 +1,108 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import os
+import unittest
+
+import pygame
+
+import events
+import levelpack
+from level import Level
+from tiles import GlassTile, TileGroup, WIDTH
+from tile_grid import TileGrid, CODES, HIT
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class TileGridTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_grid.pack"
+        grid = levelpack.parse("0 0 r\n0 1 g\n0 2 b\n1 1 e\n2 2 u\n5 5 e\n15 15 r\n")
+        levelpack.write(self.path, {1: grid})
+        self.pack = levelpack.LevelPack(self.path)
+        self.grid = TileGrid.from_pack(self.pack, 1)
+
+    def tearDown(self):
+        self.pack.close()
+        os.remove(self.path)
+        Level.tile_engine = "sprite"
+
+    def level(self, tile_engine):
+        Level.tile_engine = tile_engine
+        return Level(1, self.pack[1])
+
+    def test_from_pack(self):
+        record = self.pack[1]
+        for i, column in enumerate(record.grid):
+            for j, alias in enumerate(column):
+                self.assertEqual(self.grid.codes[i, j], 0 if alias is None else CODES[alias])
+        self.assertTrue((TileGrid.from_record(record).codes == self.grid.codes).all())
+        self.assertEqual(len(self.grid), 7)
+        self.assertEqual(self.grid.remaining(), 6)
+        self.assertFalse(self.grid.sprites())
+
+    def test_queries(self):
+        self.assertEqual(self.grid.neighbours(0, 0), [(1, 0), (1, 1)])
+        self.assertEqual(self.grid.neighbours(15, 15), [])
+
+        rect = TileGrid.cell_rect(0, 0).inflate(10, -10)
+        self.assertEqual(self.grid.overlapping(rect), [(0, 0), (1, 0)])
+        self.assertEqual(self.grid.overlapping(rect.inflate(0, 20)), [(0, 0), (1, 0), (1, 1)])
+        self.assertEqual(self.grid.overlapping(rect.move(-5 * WIDTH, 0)), [])
+
+    def test_tile(self):
+        glass = self.grid.tile(1, 0)
+        self.assertIsInstance(glass, GlassTile)
+        self.assertEqual(glass.rect, TileGrid.cell_rect(1, 0))
+        self.assertIs(self.grid.tile(1, 0), glass)
+        self.assertIsNone(self.grid.tile(3, 3))
+        self.assertIsNone(self.grid.tile(-1, 0))
+
+        glass.on_hit()
+        self.assertEqual(self.grid.state[1, 0], HIT)
+        glass.on_hit()
+        self.assertEqual(self.grid.codes[1, 0], 0)
+        self.assertIsNone(self.grid.tile(1, 0))
+        self.assertEqual(self.grid.remaining(), 5)
+
+    def test_blits(self):
+        self.grid.state[1, 0] = HIT
+        blits = self.grid.blits()
+        self.assertEqual(len(blits), 7)
+        self.assertIn((GlassTile.images["hit"], TileGrid.cell_rect(1, 0).topleft), blits)
+        self.assertEqual(self.grid.blits(TileGrid.cell_rect(1, 0)), blits[1:2])
+        self.assertFalse(self.grid.sprites())
+
+    def test_explosion(self):
+        # e (1, 1) sets off u (2, 2), which doesn't reach e (5, 5)
+        results = []
+        for tile_engine in ("sprite", "grid"):
+            lvl = self.level(tile_engine)
+            events.get()
+            lvl.tiles.tile(1, 1).kill()
+            lvl.explosion(*TileGrid.cell_rect(1, 1).center)
+            points = [event.points for event in events.get() if isinstance(event, events.Points)]
+            results.append((points, sorted(lvl.tiles.occupied()), lvl.tiles.remaining()))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(results[1][1]), 2)
+
+    def test_level(self):
+        lvl = self.level("grid")
+        self.assertIsInstance(lvl.tiles, TileGrid)
+        self.assertIsNone(lvl.tile_matrix)
+
+        background = pygame.Surface((800, 800))
+        layer = self.level("sprite")
+        layer.bake(background)
+        lvl.bake(background)
+        self.assertEqual(pygame.image.tostring(lvl.layer, "RGB"),
+                         pygame.image.tostring(layer.layer, "RGB"))
+        self.assertNotIsInstance(layer.tiles, TileGrid)
+        self.assertIsInstance(layer.tiles, TileGroup)
+        Level.tile_engine = "grid"
+        self.assertIsInstance(Level(0).tiles, TileGrid)
+
+
+if __name__ == "__main__":
+    unittest.main()
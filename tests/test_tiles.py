@@ -4,7 +4,8 @@ import unittest
 import pygame
 
 import events
-from tiles import RegularTile, GlassTile, Brick, UnstableTile, ExplosiveTile
+from main import MARGIN
+from tiles import RegularTile, GlassTile, Brick, UnstableTile, ExplosiveTile, TileGroup
 
 
 pygame.init()
@@ -50,7 +51,7 @@ class UnstableTileTestCase(unittest.TestCase):
         self.assertTrue(tile.alive())
         tile.on_hit()
         self.assertFalse(tile.alive())
-        self.assertIn(events.EXPLOSION, (event.type for event in pygame.event.get()))
+        self.assertIn(events.Explosion, (type(event) for event in events.get()))
 
 
 class ExplosiveTileTestCase(unittest.TestCase):
@@ -60,7 +61,28 @@ class ExplosiveTileTestCase(unittest.TestCase):
         tile_group.add(tile)
         tile.on_hit()
         self.assertFalse(tile.alive())
-        self.assertIn(events.EXPLOSION, (event.type for event in pygame.event.get()))
+        self.assertIn(events.Explosion, (type(event) for event in events.get()))
+
+
+class TileGroupTestCase(unittest.TestCase):
+    def test_collide(self):
+        tiles = TileGroup()
+        left, right = RegularTile(MARGIN, 3 * MARGIN), Brick(MARGIN + 60, 3 * MARGIN)
+        tiles.add(left, right)
+        self.assertEqual(tiles.cell(*right.rect.center), (1, 0))
+
+        rect = pygame.Rect(0, 0, 16, 16)
+        rect.center = right.rect.midleft
+        self.assertEqual(tiles.collide(rect), [left, right])
+        rect.center = right.rect.center
+        self.assertEqual(tiles.collide(rect), [right])
+        rect.top = right.rect.bottom
+        self.assertEqual(tiles.collide(rect), [])
+
+        left.kill()
+        self.assertNotIn((0, 0), tiles.cells)
+        tiles.empty()
+        self.assertFalse(tiles.cells)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import unittest
+
+from timers import Scheduler
+
+
+class SchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.calls = []
+
+    def test_after(self):
+        self.scheduler.after(200, lambda: self.calls.append(("b", self.scheduler.now)))
+        self.scheduler.after(100, lambda: self.calls.append(("a", self.scheduler.now)))
+        self.scheduler.after(200, lambda: self.calls.append(("c", self.scheduler.now)))
+        self.scheduler.advance(150)
+        self.assertEqual(self.calls, [("a", 100)])
+        self.assertEqual(self.scheduler.now, 150)
+        self.scheduler.advance(1000)
+        self.assertEqual(self.calls, [("a", 100), ("b", 200), ("c", 200)])
+        self.assertFalse(self.scheduler.queue)
+
+    def test_until_next(self):
+        self.assertIsNone(self.scheduler.until_next())
+        timer = self.scheduler.after(100, lambda: None)
+        self.scheduler.every(300, lambda: None)
+        self.scheduler.advance(40)
+        self.assertEqual(self.scheduler.until_next(), 60)
+        timer.cancel()
+        self.assertEqual(self.scheduler.until_next(), 260)
+        self.scheduler.now += 500 # not advanced yet
+        self.assertEqual(self.scheduler.until_next(), 0)
+
+    def test_every(self):
+        timer = self.scheduler.every(100, lambda: self.calls.append(self.scheduler.now), delay=50)
+        self.scheduler.advance(300)
+        self.assertEqual(self.calls, [50, 150, 250])
+        timer.cancel()
+        self.scheduler.advance(300)
+        self.assertEqual(self.calls, [50, 150, 250])
+
+    def test_cancel(self):
+        timer = self.scheduler.after(100, lambda: self.calls.append(1))
+        self.scheduler.after(100, timer.cancel) # scheduled later, called later
+        self.scheduler.after(50, lambda: self.scheduler.after(10, lambda: self.calls.append(2)))
+        timer.cancel()
+        self.scheduler.advance(100)
+        self.assertEqual(self.calls, [2])
+
+        self.scheduler.after(100, lambda: self.calls.append(3))
+        self.scheduler.clear()
+        self.scheduler.advance(100)
+        self.assertEqual(self.calls, [2])
+
+    def test_tween(self):
+        tween = self.scheduler.tween(0, 255, 1000, delay=500)
+        self.assertFalse(tween.started)
+        self.assertEqual(tween.value, 0)
+        self.scheduler.advance(1000)
+        self.assertTrue(tween.started)
+        self.assertFalse(tween.done)
+        self.assertEqual(tween.value, 127.5)
+        self.scheduler.advance(1000)
+        self.assertTrue(tween.done)
+        self.assertEqual(tween.value, 255)
+
+        tween = self.scheduler.tween(1, 0, 100, ease=lambda t: t * t)
+        self.scheduler.advance(50)
+        self.assertEqual(tween.value, 0.75)
+
+        tween = self.scheduler.tween(0, 10, 100, repeat=True)
+        self.scheduler.advance(250)
+        self.assertEqual(tween.value, 5)
+        self.assertFalse(tween.done)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# pylint: disable=no-member,missing-module-docstring,missing-class-docstring,missing-function-docstring,invalid-name
+import csv
+import os
+import time
+import unittest
+
+import pygame
+
+import timing
+from level import Level
+
+
+pygame.init()
+pygame.mixer.set_num_channels(0)
+
+
+class FrameTimerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.timer = timing.start(window=10, trace=5)
+
+    def tearDown(self):
+        timing.timer = None
+        try:
+            os.remove("test_trace.csv")
+        except FileNotFoundError:
+            pass
+
+    def test_phase(self):
+        for _ in range(20):
+            with timing.phase("a"):
+                time.sleep(0.001)
+            with timing.phase("a"):
+                pass
+            Level(0).update(dx=0)
+            timing.end_frame()
+
+        self.assertEqual(self.timer.frames, 20)
+        self.assertEqual(len(self.timer.recent["a"]), 10)
+        self.assertEqual(len(self.timer.trace), 5)
+        self.assertGreaterEqual(self.timer.percentile("a", 50), 1)
+        self.assertGreaterEqual(self.timer.percentile("frame", 99), self.timer.percentile("a", 99))
+        self.assertIn("update.explosions", self.timer.recent)
+        self.assertIsNone(self.timer.percentile("b", 50))
+        self.assertLess(self.timer.fps(), 1000)
+
+        self.timer.dump("test_trace.csv")
+        with open("test_trace.csv", newline="", encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0][:3], ["n", "frame", "a"])
+        self.assertEqual([row[0] for row in rows[1:]], ["15", "16", "17", "18", "19"])
+
+    def test_no_trace(self):
+        timer = timing.start()
+        for _ in range(3):
+            timing.end_frame()
+        self.assertFalse(timer.trace)
+        self.assertEqual(len(timer.recent["frame"]), 3)
+
+    def test_draw(self):
+        surface = pygame.Surface((200, 100)) # pylint: disable=too-many-function-args
+        rect = self.timer.draw(surface)
+        self.assertEqual(rect.topleft, (0, 0))
+        self.assertIn("FPS", self.timer.summary())
+
+    def test_off(self):
+        timing.timer = None
+        with timing.phase("a"):
+            pass
+        timing.end_frame()
+        self.assertNotIn("a", self.timer.recent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# pylint: disable=missing-function-docstring,invalid-name
+""" Module containing the TileGrid class, a NumPy alternative to a group of
+    Tile sprites (see Level.tile_engine), meant for much larger grids and
+    for keeping very many levels in memory at once (e.g. simulations). """
+
+import numpy
+
+import levelpack
+from tiles import Tile, TileGroup
+
+CODES = {alias: k + 1 for k, alias in enumerate(levelpack.TYPES)} # 0 is an empty cell
+TYPES = [None] + [Tile.types[alias] for alias in levelpack.TYPES] # tile types by code
+DESTRUCTIBLE = numpy.array([False] + [tile_type.destructible for tile_type in TYPES[1:]])
+HIT = 1 # state bit of the tiles which have been hit (see GlassTile.hit)
+
+
+class TileGrid(TileGroup):
+    """ Class representing the tiles of a level as two byte arrays indexed
+        by grid cells (column, row): the type codes of the tiles (see
+        levelpack) and their states (see HIT). A tile becomes a Tile sprite
+        only when it is needed, i.e. when a ball or an explosion reaches it
+        (see tile), so it behaves exactly as in a TileGroup; the group holds
+        only these sprites, while len() counts all tiles. Everything else
+        (drawing, the number of tiles left, the occupied cells) is read from
+        the arrays.
+
+        Parameters
+            columns, rows: int - size of the grid """
+
+    def __init__(self, columns=levelpack.COLUMNS, rows=levelpack.ROWS):
+        self.codes = numpy.zeros((columns, rows), dtype=numpy.uint8)
+        self.state = numpy.zeros((columns, rows), dtype=numpy.uint8)
+        TileGroup.__init__(self, columns=columns, rows=rows)
+
+    @classmethod
+    def from_record(cls, record):
+        """ Returns the grid of a levelpack.Record. """
+        grid = cls(len(record.grid), len(record.grid[0]))
+        grid.codes[:] = [[0 if alias is None else CODES[alias] for alias in column]
+                         for column in record.grid]
+        return grid
+
+    @classmethod
+    def from_pack(cls, pack, n):
+        """ Returns the grid of level n of a LevelPack, read straight from
+            the record without decoding it. """
+        offset = pack.offsets[n] + levelpack.RECORD.size - levelpack.COLUMNS * levelpack.ROWS
+        codes = numpy.frombuffer(pack.data, numpy.uint8, levelpack.COLUMNS * levelpack.ROWS, offset)
+        if codes.max() > len(levelpack.TYPES):
+            raise levelpack.LevelPackError(f"{pack.path}: invalid tile type in level {n}")
+        grid = cls()
+        grid.codes[:] = codes.reshape(levelpack.COLUMNS, levelpack.ROWS)
+        return grid
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.codes))
+
+    def __bool__(self):
+        return bool(self.codes.any())
+
+    def store(self, i, j, tile):
+        """ Writes the type and the state of tile to cell (i, j). """
+        self.codes[i, j] = TYPES.index(type(tile))
+        self.state[i, j] = HIT if getattr(tile, "hit", False) else 0
+
+    def tile(self, i, j):
+        """ Returns the tile in cell (i, j) or None, creating its sprite
+            the first time it is asked for. """
+        if not (0 <= i < self.columns and 0 <= j < self.rows):
+            return None
+        tile = self.cells.get((i, j))
+        if tile is None and self.codes[i, j]:
+            tile = TYPES[self.codes[i, j]](*self.cell_rect(i, j).topleft)
+            if self.state[i, j] & HIT:
+                tile.hit = True
+                tile.image = tile.cell_image(True)
+            self.add(tile)
+        return tile
+
+    def add_internal(self, sprite, *args):
+        TileGroup.add_internal(self, sprite, *args)
+        self.store(*self.cell(*sprite.rect.topleft), sprite)
+
+    def remove_internal(self, sprite):
+        i, j = self.cell(*sprite.rect.topleft)
+        if self.cells.get((i, j)) is sprite:
+            self.codes[i, j] = self.state[i, j] = 0
+        TileGroup.remove_internal(self, sprite)
+
+    def changed(self, tile):
+        TileGroup.changed(self, tile)
+        self.store(*self.cell(*tile.rect.topleft), tile)
+
+    def occupied(self):
+        return [(int(i), int(j)) for i, j in numpy.argwhere(self.codes)]
+
+    def remaining(self):
+        return int(numpy.count_nonzero(DESTRUCTIBLE[self.codes]))
+
+    def neighbours(self, i, j):
+        """ Returns the cells around (i, j) which hold a tile. """
+        i0, j0 = max(i - 1, 0), max(j - 1, 0)
+        window = self.codes[i0:i + 2, j0:j + 2] != 0
+        if 0 <= i < self.columns and 0 <= j < self.rows:
+            window[i - i0, j - j0] = False
+        return [(i0 + int(k), j0 + int(l)) for k, l in numpy.argwhere(window)]
+
+    def overlapping(self, rect):
+        """ Returns the cells holding a tile which rect overlaps, row by
+            row like TileGroup.collide. """
+        i1, j1 = self.cell(rect.left, rect.top)
+        i2, j2 = self.cell(rect.right - 1, rect.bottom - 1)
+        i1, j1 = max(i1, 0), max(j1, 0)
+        window = self.codes[i1:max(i2 + 1, 0), j1:max(j2 + 1, 0)].T != 0
+        return [(i1 + int(k), j1 + int(l)) for l, k in numpy.argwhere(window)]
+
+    def collide(self, rect):
+        return [self.tile(i, j) for i, j in self.overlapping(rect)]
+
+    def blits(self, rect=None):
+        """ Returns the (image, position) pairs of the tiles overlapping
+            rect (of all tiles if None), creating no sprites. """
+        cells = self.occupied() if rect is None else self.overlapping(rect)
+        blits = []
+        for i, j in cells:
+            tile = self.cells.get((i, j))
+            if tile is None:
+                image = TYPES[self.codes[i, j]].cell_image(bool(self.state[i, j] & HIT))
+            else:
+                image = tile.image
+            blits.append((image, self.cell_rect(i, j).topleft))
+        return blits
@@ -2,13 +2,18 @@
 """ Module containing all tile types. """
 
 import abc
-import os
 import random
 
 import pygame
 
 import events
+from assets import Image, Images
+from audio import Sound
+import levelpack
 from bonuses import random_bonus
+from main import MARGIN
+
+WIDTH, HEIGHT = 60, 30 # size of a grid cell
 
 
 class Tile(abc.ABC, pygame.sprite.Sprite):
@@ -17,6 +22,8 @@ class Tile(abc.ABC, pygame.sprite.Sprite):
         names of tiles and their corresponding classes. """
     p_bonus = 0.1 # probability of a bonus being dropped
     image = None  # to be specified in subclasses
+    explosive = False # whether the tile sets off an explosion when killed
+    destructible = True # whether a basic ball can destroy the tile, see TileGroup.remaining
 
     types = {} # the mapping between tile aliases and their corresponding classes
 
@@ -38,9 +45,22 @@ class Tile(abc.ABC, pygame.sprite.Sprite):
     def on_hit(self):
         """ Defines what happens when a particular tile is hit. """
 
+    @classmethod
+    def cell_image(cls, hit=False): # pylint: disable=unused-argument
+        """ Returns the image of a tile of this type which has been hit
+            (if it changes) or not, without creating it (see TileGrid). """
+        return cls.image
+
+    def set_image(self, image):
+        """ Changes the image of the tile and marks it to be redrawn. """
+        self.image = image
+        for group in self.groups():
+            if isinstance(group, TileGroup):
+                group.changed(self)
+
     def kill(self):
         # base point value
-        pygame.event.post(pygame.event.Event(events.POINTS, points=5))
+        events.post(events.Points(5))
 
         # roll a bonus
         if random.random() < self.p_bonus:
@@ -53,10 +73,8 @@ class Tile(abc.ABC, pygame.sprite.Sprite):
 @Tile.register_type("r")
 class RegularTile(Tile):
     """ Basic tile. Takes one hit to destroy. """
-    image = pygame.image.load(os.path.join("images", "tiles", "regular.png"))
-    sound = pygame.mixer.Sound(os.path.join("sounds", "r_death.wav"))
-
-    sound.set_volume(0.4)
+    image = Image("tiles", "regular.png")
+    sound = Sound("sounds", "r_death.wav", volume=0.4)
 
     def on_hit(self):
         self.sound.play()
@@ -67,25 +85,25 @@ class RegularTile(Tile):
 class GlassTile(Tile):
     """ Invisible tile that becomes visible after the first hit. After another hit
         the tile gets destroyed but the ball doesn't change its direction. """
-    images = {"base": pygame.image.load(os.path.join("images", "tiles", "glass.png")),
-              "hit": pygame.image.load(os.path.join("images", "tiles", "broken.png"))}
-    sounds = {"hit": pygame.mixer.Sound(os.path.join("sounds", "g_hit.wav")),
-              "death": pygame.mixer.Sound(os.path.join("sounds", "g_death.wav"))}
-
-    sounds["hit"].set_volume(0.1)
-    sounds["death"].set_volume(0.1)
+    images = Images({"base": ("tiles", "glass.png"), "hit": ("tiles", "broken.png")})
+    sounds = {"hit": Sound("sounds", "g_hit.wav", volume=0.1),
+              "death": Sound("sounds", "g_death.wav", volume=0.1)}
 
     def __init__(self, x, y):
         self.image = self.images["base"]
         self.hit = False
         Tile.__init__(self, x, y)
 
+    @classmethod
+    def cell_image(cls, hit=False):
+        return cls.images["hit" if hit else "base"]
+
     def on_hit(self):
         if not self.hit:
             self.sounds["hit"].play()
-            pygame.event.post(pygame.event.Event(events.POINTS, points=5))
-            self.image = self.images["hit"]
+            events.post(events.Points(5))
             self.hit = True
+            self.set_image(self.images["hit"])
         else:
             self.sounds["death"].play()
             self.kill()
@@ -94,10 +112,9 @@ class GlassTile(Tile):
 @Tile.register_type("b")
 class Brick(Tile):
     """ Tile that basic ball can't destroy. """
-    image = pygame.image.load(os.path.join("images", "tiles", "brick.png"))
-    sound = pygame.mixer.Sound(os.path.join("sounds", "wall_hit.wav"))
-
-    sound.set_volume(0.25)
+    image = Image("tiles", "brick.png")
+    sound = Sound("sounds", "wall_hit.wav", volume=0.25, voices=3)
+    destructible = False
 
     def on_hit(self):
         self.sound.play()
@@ -106,40 +123,119 @@ class Brick(Tile):
 @Tile.register_type("u")
 class UnstableTile(Tile):
     """ After a hit becomes explosive. """
-    images = {"base": pygame.image.load(os.path.join("images", "tiles", "unstable.png")),
-              "hit": pygame.image.load(os.path.join("images", "tiles", "explosive.png"))}
-    sound = pygame.mixer.Sound(os.path.join("sounds", "u_hit.wav"))
+    images = Images({"base": ("tiles", "unstable.png"), "hit": ("tiles", "explosive.png")})
+    sound = Sound("sounds", "u_hit.wav")
+    explosive = True
+    points = 10 # on top of the base point value
 
     def __init__(self, x, y):
         self.hit = False
         self.image = self.images["base"]
         Tile.__init__(self, x, y)
 
+    @classmethod
+    def cell_image(cls, hit=False):
+        return cls.images["hit" if hit else "base"]
+
     def on_hit(self):
         if not self.hit:
-            pygame.event.post(pygame.event.Event(events.POINTS, points=5))
+            events.post(events.Points(5))
             self.sound.play()
             self.hit = True
-            self.image = self.images["hit"]
+            self.set_image(self.images["hit"])
         else:
             self.kill()
 
     def kill(self):
-        pygame.event.post(pygame.event.Event(events.POINTS, points=10))
-        pygame.event.post(pygame.event.Event(events.EXPLOSION, where=self.rect.topleft))
+        events.post(events.Points(self.points))
+        events.post(events.Explosion(self.rect.topleft))
         Tile.kill(self)
 
 
 @Tile.register_type("e")
 class ExplosiveTile(Tile):
     """ Explodes when hit. """
-    image = pygame.image.load(os.path.join("images", "tiles", "explosive.png"))
+    image = Image("tiles", "explosive.png")
+    explosive = True
+    points = 10 # on top of the base point value
 
     def on_hit(self):
         self.kill()
 
     def kill(self):
-        pygame.event.post(pygame.event.Event(events.POINTS, points=10))
-        pygame.event.post(pygame.event.Event(events.EXPLOSION, where=self.rect.topleft))
+        events.post(events.Points(self.points))
+        events.post(events.Explosion(self.rect.topleft))
         Tile.kill(self)
-        
\ No newline at end of file
+
+
+class TileGroup(pygame.sprite.Group):
+    """ Group of tiles additionally indexed by grid cells, so that the tiles
+        overlapping a rect can be found without checking all of them. Sprites
+        notify their groups when they get killed, so the index is always
+        in sync with the group.
+
+        Parameters
+            columns, rows: int - size of the grid """
+
+    def __init__(self, *tiles, columns=levelpack.COLUMNS, rows=levelpack.ROWS):
+        self.columns, self.rows = columns, rows
+        self.cells = {} # the mapping between grid cells and tiles
+        self.damaged = [] # rects of tiles killed or changed since the last draw
+        pygame.sprite.Group.__init__(self, *tiles)
+
+    @staticmethod
+    def cell(x, y):
+        """ Returns the grid cell (column, row) containing the point (x, y). """
+        return (x - MARGIN) // WIDTH, (y - 3 * MARGIN) // HEIGHT
+
+    @staticmethod
+    def cell_rect(i, j):
+        """ Returns the rect of the grid cell (i, j). """
+        return pygame.Rect(MARGIN + WIDTH * i, 3 * MARGIN + HEIGHT * j, WIDTH, HEIGHT)
+
+    def tile(self, i, j):
+        """ Returns the tile in the grid cell (i, j) or None. """
+        return self.cells.get((i, j))
+
+    def occupied(self):
+        """ Returns the grid cells holding a tile. """
+        return list(self.cells)
+
+    def remaining(self):
+        """ Returns the number of destructible tiles left, the level is
+            cleared when there are none. """
+        return sum(tile.destructible for tile in self)
+
+    def blits(self, rect=None):
+        """ Returns the (image, position) pairs of the tiles overlapping
+            rect (of all tiles if None). """
+        tiles = self if rect is None else self.collide(rect)
+        return [(tile.image, tile.rect.topleft) for tile in tiles]
+
+    def changed(self, tile):
+        """ Triggered when the image of a tile has changed (see Tile.set_image). """
+        self.damaged.append(tile.rect)
+
+    def add_internal(self, sprite, *args):
+        pygame.sprite.Group.add_internal(self, sprite, *args)
+        self.cells[self.cell(*sprite.rect.topleft)] = sprite
+
+    def remove_internal(self, sprite):
+        pygame.sprite.Group.remove_internal(self, sprite)
+        cell = self.cell(*sprite.rect.topleft)
+        if self.cells.get(cell) is sprite:
+            del self.cells[cell]
+        self.damaged.append(sprite.rect)
+
+    def collide(self, rect):
+        """ Returns the tiles colliding with rect. Only the (at most four for
+            a ball) cells overlapped by rect are checked. """
+        i1, j1 = self.cell(rect.left, rect.top)
+        i2, j2 = self.cell(rect.right - 1, rect.bottom - 1)
+        tiles = []
+        for j in range(j1, j2 + 1):
+            for i in range(i1, i2 + 1):
+                tile = self.cells.get((i, j))
+                if tile is not None and rect.colliderect(tile.rect):
+                    tiles.append(tile)
+        return tiles
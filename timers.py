@@ -0,0 +1,114 @@
+# pylint: disable=missing-function-docstring
+""" Module containing the Scheduler of timers and tweens. The main loop
+    advances it by the time each frame has taken, so delays and fades are
+    declared once instead of being computed from pygame.time.get_ticks()
+    in every frame, and nothing has to sleep. The time is virtual: tests
+    advance it instantly. """
+
+import heapq
+import itertools
+
+
+class Timer: # pylint: disable=too-few-public-methods
+    """ Class representing a callback scheduled by Scheduler.after or
+        Scheduler.every. """
+
+    def __init__(self, when, callback, interval=None):
+        self.when = when # virtual time (in ms) of the next call
+        self.callback = callback
+        self.interval = interval # ms between calls, None if called once
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Tween:
+    """ Class representing a value going from start to end in duration ms,
+        starting delay ms after it has been created (see Scheduler.tween).
+        A repeated tween starts over from start every duration ms. """
+
+    def __init__(self, clock, start, end, duration, *, delay=0, ease=None, repeat=False):
+        # pylint: disable=too-many-arguments
+        self.scheduler = clock # the Scheduler giving the time
+        self.start, self.end = start, end
+        self.begin = clock.now + delay
+        self.duration = duration
+        self.ease = ease
+        self.repeat = repeat
+
+    @property
+    def started(self):
+        return self.scheduler.now >= self.begin
+
+    @property
+    def done(self):
+        return not self.repeat and self.scheduler.now >= self.begin + self.duration
+
+    @property
+    def value(self):
+        t = max(0, self.scheduler.now - self.begin) / self.duration
+        t = t % 1 if self.repeat else min(t, 1)
+        if self.ease is not None:
+            t = self.ease(t)
+        return self.start + (self.end - self.start) * t
+
+
+class Scheduler:
+    """ Class running timers in the order of their times, kept in a heap,
+        as the virtual time advances. """
+
+    def __init__(self):
+        self.now = 0 # virtual time in ms
+        self.queue = [] # heap of (when, n, Timer)
+        self.counter = itertools.count() # keeps timers due at the same time in order
+
+    def push(self, timer):
+        heapq.heappush(self.queue, (timer.when, next(self.counter), timer))
+        return timer
+
+    def after(self, delay, callback):
+        """ Calls callback once, delay ms from now. Returns the Timer. """
+        return self.push(Timer(self.now + delay, callback))
+
+    def every(self, interval, callback, delay=None):
+        """ Calls callback every interval ms, starting delay ms from now
+            (interval if None). Returns the Timer. """
+        when = self.now + (interval if delay is None else delay)
+        return self.push(Timer(when, callback, interval))
+
+    def tween(self, start, end, duration, *, delay=0, ease=None, repeat=False):
+        """ Returns a Tween, see its description. """
+        # pylint: disable=too-many-arguments
+        return Tween(self, start, end, duration, delay=delay, ease=ease, repeat=repeat)
+
+    def until_next(self):
+        """ Returns the ms until the next timer is due (0 if it is overdue),
+            None if there is none, e.g. for the main loop to wake up in time. """
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        return max(0, self.queue[0][0] - self.now) if self.queue else None
+
+    def advance(self, dt):
+        """ Advances the time by dt ms, calling the timers due meanwhile.
+            Each one is called with the time set to when it was due. """
+        end = self.now + dt
+        while self.queue and self.queue[0][0] <= end:
+            when, _, timer = heapq.heappop(self.queue)
+            if timer.cancelled:
+                continue
+            self.now = when
+            timer.callback()
+            if timer.interval is not None and not timer.cancelled:
+                timer.when += timer.interval
+                self.push(timer)
+        self.now = end
+
+    def clear(self):
+        """ Cancels all timers. """
+        for _, _, timer in self.queue:
+            timer.cancel()
+        self.queue.clear()
+
+
+scheduler = Scheduler() # driven by the main loop
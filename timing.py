@@ -0,0 +1,142 @@
+# pylint: disable=invalid-name
+""" Module measuring where the time of a frame goes. Code wraps its phases
+    in `with timing.phase("name"):` blocks and the main loop calls
+    timing.end_frame() once per frame; nothing is measured until a
+    FrameTimer is started. Phases may be nested, nested names are usually
+    prefixed with the outer ones (e.g. "update.balls"). Other per-frame
+    measurements (e.g. the input latency) are added with timing.record. """
+
+import collections
+import contextlib
+import csv
+import time
+
+import pygame
+
+import fonts
+
+
+class FrameTimer: # pylint: disable=too-many-instance-attributes
+    """ Class keeping the durations of the phases of the recent frames, for
+        rolling statistics, and a longer trace of them which can be written
+        to a CSV file. Durations are in milliseconds.
+
+        Parameters
+            window: int - number of frames the statistics are computed from
+            trace: int - number of frames kept in the trace, none by
+                default as only a trace written to a file needs them """
+    REFRESH = 250 # ms between updates of the overlay text
+    TRACE = 100_000 # frames kept in a trace written to a file (see dump)
+
+    def __init__(self, window=600, trace=0):
+        self.window = window
+        self.recent = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.trace = collections.deque(maxlen=trace)
+        self.current = collections.defaultdict(float) # phase -> duration in this frame
+        self.last = time.perf_counter() # end of the previous frame
+        self.frames = 0
+
+        self.overlay = False # whether the statistics are drawn on the screen
+        self.text = None
+        self.refreshed = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ Measures the duration of the with block, added to the phase. """
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += 1000 * (time.perf_counter() - begin)
+
+    def record(self, name, value):
+        """ Stores a measurement of the current frame other than a phase. """
+        self.current[name] = value
+
+    def end_frame(self):
+        """ Stores the durations of the phases of the frame that has ended. """
+        now = time.perf_counter()
+        durations = dict(self.current, frame=1000 * (now - self.last))
+        self.last = now
+        self.current.clear()
+        self.frames += 1
+
+        for name, duration in durations.items():
+            self.recent[name].append(duration)
+        self.trace.append(durations)
+
+    def percentile(self, name, p):
+        """ Returns the p-th percentile of the durations of a phase in the
+            recent frames (None if the phase hasn't been measured). """
+        durations = sorted(self.recent.get(name, ()))
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(p / 100 * len(durations)))]
+
+    def fps(self):
+        """ Returns the frame rate of the recent frames. """
+        durations = self.recent.get("frame")
+        if not durations:
+            return 0
+        return 1000 * len(durations) / sum(durations)
+
+    def summary(self):
+        """ Returns the rolling statistics as a line of text. """
+        p50, p99 = self.percentile("frame", 50) or 0, self.percentile("frame", 99) or 0
+        text = f"{self.fps():.0f} FPS  p50 {p50:.1f} ms  p99 {p99:.1f} ms"
+        latency = self.percentile("latency", 50)
+        if latency is not None:
+            text += f"  input {latency:.1f} ms"
+        return text
+
+    def draw(self, surface):
+        """ Draws the statistics in the top left corner and returns their
+            rect. The text has an opaque background and a fixed size, so it
+            covers its previous version. """
+        ticks = pygame.time.get_ticks()
+        if self.text is None or ticks - self.refreshed >= self.REFRESH:
+            text = fonts.get("small_font").render(self.summary(), True, pygame.Color("white"))
+            self.text = pygame.Surface((560, text.get_height())) # pylint: disable=too-many-function-args
+            self.text.blit(text, (4, 0))
+            self.refreshed = ticks
+        return surface.blit(self.text, (0, 0))
+
+    def dump(self, path):
+        """ Writes the trace as CSV, one row per frame and one column per phase. """
+        names = ["frame"]
+        for durations in self.trace:
+            names.extend(name for name in durations if name not in names)
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["n"] + names)
+            first = self.frames - len(self.trace)
+            for k, durations in enumerate(self.trace):
+                writer.writerow([first + k] + [f"{durations.get(name, 0):.3f}" for name in names])
+
+
+timer = None # the timer of the running game, see start
+off = contextlib.nullcontext()
+
+
+def start(**kwargs):
+    """ Starts measuring the frames; see FrameTimer for the parameters. """
+    global timer # pylint: disable=global-statement
+    timer = FrameTimer(**kwargs)
+    return timer
+
+
+def phase(name):
+    """ Returns a context manager measuring the duration of a phase. """
+    return off if timer is None else timer.phase(name)
+
+
+def record(name, value):
+    """ Stores a measurement of the current frame, see FrameTimer.record. """
+    if timer is not None:
+        timer.record(name, value)
+
+
+def end_frame():
+    """ Ends the current frame, see FrameTimer.end_frame. """
+    if timer is not None:
+        timer.end_frame()